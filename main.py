@@ -1,6 +1,50 @@
 """Main"""
+import argparse
 from src.game_loop import GameLoop
+from src.viewport import WORLD_HEIGHT, WORLD_WIDTH, parse_size
 
 if __name__ == "__main__":
-    game = GameLoop()
+    parser = argparse.ArgumentParser(description = "Ascension")
+    parser.add_argument("--profile", action = "store_true",
+                        help = "show the frame profiler overlay (toggle with F3)")
+    parser.add_argument("--trace", help = "write a Chrome trace of the profiled frames on exit")
+    parser.add_argument("--dirty-rects", action = "store_true",
+                        help = "only push the changed parts of static screens to the display")
+    parser.add_argument("--entity-store", action = "store_true",
+                        help = "keep orbs and fireballs in NumPy arrays (needs numpy)")
+    parser.add_argument("--fps", type = int, default = 60,
+                        help = "frame rate limit, the game always runs at 60 ticks per second")
+    parser.add_argument("--waves", default = "waves.json",
+                        help = "json file with the spawn waves of each phase")
+    parser.add_argument("--record", help = "save the input of this session to a replay file")
+    parser.add_argument("--replay", help = "play back a session saved with --record")
+    parser.add_argument("--render-size", type = parse_size, default = (WORLD_WIDTH, WORLD_HEIGHT),
+                        help = "resolution the game is drawn at, for example 640x360")
+    parser.add_argument("--window-size", type = parse_size, default = (WORLD_WIDTH, WORLD_HEIGHT),
+                        help = "size of the window the drawn frame is scaled to")
+    parser.add_argument("--integer-scale", action = "store_true",
+                        help = "only scale the frame by whole multiples to keep pixel art sharp")
+    parser.add_argument("--rewind", type = float, default = 5, metavar = "SECONDS",
+                        help = "how far back Backspace can rewind, 0 turns rewinding off, "
+                               "it is always off with --manual-gc")
+    parser.add_argument("--load-state", help = "start from a state saved with F5")
+    parser.add_argument("--manual-gc", action = "store_true",
+                        help = "only collect garbage between phases instead of during play, "
+                               "this turns rewinding off")
+    parser.add_argument("--quality", choices = ["auto", "0", "1", "2", "3"], default = "auto",
+                        help = "drawing quality from 0 (best) to 3 (fastest), "
+                               "auto lowers it whenever frames go over budget")
+    args = parser.parse_args()
+
+    game = GameLoop(profile = args.profile or args.trace is not None, trace_path = args.trace,
+                    dirty_rects = args.dirty_rects, entity_store = args.entity_store,
+                    max_fps = args.fps, waves_path = args.waves,
+                    record_path = args.record, replay_path = args.replay,
+                    render_size = args.render_size, window_size = args.window_size,
+                    integer_scaling = args.integer_scale, rewind_seconds = args.rewind,
+                    manual_gc = args.manual_gc,
+                    quality_level = 0 if args.quality == "auto" else int(args.quality),
+                    adaptive_quality = args.quality == "auto")
+    if args.load_state is not None:
+        game.load_state(args.load_state)
     game.run()
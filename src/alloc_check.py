@@ -0,0 +1,121 @@
+"""
+Module for checking how much memory the steady-state frame loop allocates.
+
+Run it from the project folder with:
+    python -m src.alloc_check --frames 600 --threshold 4096
+It exits with an error if any frame of a phase allocated more than the threshold
+or if the garbage collector ran while the phase was played.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from .autopilot import play_until
+from .benchmark import percentile
+from .game_loop import GameLoop
+
+PHASES = ("first", "second")
+
+
+def measure_frames(game: GameLoop, frames: int) -> dict[str, float]:
+    """
+    Function which runs frames of the game loop under tracemalloc and returns
+    the most memory allocated at once during a frame, in bytes,
+    how much of it was still held after the frame and how often the collector ran.
+    """
+    collections = []
+    def count_collection(phase: str, info: dict) -> None:
+        if phase == "start":
+            collections.append(info["generation"])
+
+    phase = game.current_phase()
+    allocated = []
+    retained = 0
+    gc.callbacks.append(count_collection)
+    tracemalloc.start()
+    try:
+        for _ in range(frames):
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            game.step()
+            current, peak = tracemalloc.get_traced_memory()
+            if game.current_phase() != phase:
+                break
+            allocated.append(peak - start)
+            retained += current - start
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(count_collection)
+
+    count = max(1, len(allocated))
+    return {"frames": len(allocated),
+            "mean_bytes": sum(allocated) / count,
+            "p95_bytes": percentile(allocated, 95) if allocated else 0,
+            "max_bytes": max(allocated, default = 0),
+            "retained_bytes_per_frame": retained / count,
+            "collections": len(collections)}
+
+
+def check_phase(
+        phase: str, frames: int, warmup: int, seed: int, entity_store: bool = False,
+        rewind_seconds: float = 5
+    ) -> dict[str, float]:
+    """
+    Function which brings a headless game with manual garbage collection into a phase,
+    lets it settle for warmup frames and measures the frames after that.
+    The game gets the same rewind setting as main.py, which manual_gc turns off.
+    The energy bar neither drains nor changes on hits, so the phase never ends on its own.
+    """
+    game = GameLoop(headless = True, seed = seed, entity_store = entity_store,
+                    scores_path = None, rewind_seconds = rewind_seconds, manual_gc = True)
+    if phase == "second":
+        play_until(game, 0, 60 * 600)
+    game.bar_drain = 0
+    game.rewards = {"orb": 0, "fireball": 0}
+
+    game.step(warmup)
+    result = measure_frames(game, frames)
+    game.scores.close()
+    gc.unfreeze()
+    gc.enable()
+    return result
+
+
+def main() -> None:
+    """Function which parses the command line, checks every phase and reports the results."""
+    parser = argparse.ArgumentParser(description = "Check the allocations of the frame loop.")
+    parser.add_argument("--frames", type = int, default = 600)
+    parser.add_argument("--warmup", type = int, default = 600,
+                        help = "frames played before measuring, to fill caches and pools")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--entity-store", action = "store_true")
+    parser.add_argument("--rewind", type = float, default = 5, metavar = "SECONDS",
+                        help = "rewind setting passed to the game, as in main.py")
+    parser.add_argument("--threshold", type = int, default = 4096,
+                        help = "most bytes a single frame may allocate")
+    args = parser.parse_args()
+
+    failures = []
+    for phase in PHASES:
+        result = check_phase(phase, args.frames, args.warmup, args.seed, args.entity_store,
+                             args.rewind)
+        print(f"{phase}: {result['frames']} frames, mean {result['mean_bytes']:.0f} B, "
+              f"p95 {result['p95_bytes']:.0f} B, max {result['max_bytes']} B, "
+              f"retained {result['retained_bytes_per_frame']:.0f} B per frame, "
+              f"{result['collections']} collections")
+        if result["frames"] < args.frames:
+            failures.append(f"{phase} phase ended after {result['frames']} frames")
+        if result["max_bytes"] > args.threshold:
+            failures.append(f"{phase} phase allocated {result['max_bytes']} B in one frame")
+        if result["collections"]:
+            failures.append(f"the garbage collector ran {result['collections']} times "
+                            f"during the {phase} phase")
+
+    for message in failures:
+        print(f"Failed: {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
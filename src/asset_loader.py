@@ -0,0 +1,62 @@
+"""Module for loading assets on a background thread"""
+import threading
+import time
+from typing import Any, Callable
+
+class AssetLoader():
+    """
+    Class which runs a list of loading jobs on a background thread
+    so the game can start before every asset is ready.
+    Results are only handed to the game on the main thread through take_results.
+    """
+    def __init__(self, jobs: dict[str, Callable[[], Any]]) -> None:
+        self.jobs = jobs
+        self.results: dict[str, Any] = {}
+        self.errors: dict[str, Exception] = {}
+
+        self.finished = threading.Event()
+        self.started_at = time.perf_counter()
+        self.load_time: float | None = None
+
+        self.thread = threading.Thread(target = self.worker, daemon = True)
+        self.thread.start()
+
+    def worker(self) -> None:
+        """
+        Function which runs every job in order on the background thread.
+        Any error of a job is kept for take_results, and the loader always ends up finished,
+        so a failing job cannot leave the game waiting for it forever.
+        """
+        try:
+            for name, job in self.jobs.items():
+                try:
+                    self.results[name] = job()
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    self.errors[name] = error
+        finally:
+            self.load_time = time.perf_counter() - self.started_at
+            self.finished.set()
+
+    def progress(self) -> float:
+        """Function which returns the finished part of the jobs between 0 and 1."""
+        if not self.jobs:
+            return 1.0
+        return (len(self.results) + len(self.errors)) / len(self.jobs)
+
+    def done(self) -> bool:
+        """Function which returns whether every job has finished."""
+        return self.finished.is_set()
+
+    def wait(self) -> None:
+        """Function which blocks until every job has finished."""
+        self.finished.wait()
+
+    def take_results(self) -> dict[str, Any]:
+        """
+        Function which waits for the jobs and returns their results,
+        raising the first error if a job failed.
+        """
+        self.wait()
+        for name, error in self.errors.items():
+            raise RuntimeError(f"Could not load {name}") from error
+        return self.results
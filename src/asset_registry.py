@@ -0,0 +1,183 @@
+"""Module for the shared asset registry"""
+import mmap
+from typing import Iterable
+import pygame
+from .helper_funcs import get_frame
+from .sprite_atlas import ATLAS_INDEX, open_atlas
+
+class AssetRegistry():
+    """
+    Class which loads every image and sprite sheet once
+    and hands out the same surfaces to all sprites that need them.
+    Frames found in a baked atlas are subsurfaces of it instead of sliced copies.
+    Assets that are no longer needed can be released and are loaded again when asked for.
+    """
+    def __init__(self) -> None:
+        self.images: dict[str, pygame.Surface] = {}
+        self.frames: dict[tuple, list[pygame.Surface]] = {}
+        self.masks: dict[pygame.Surface, pygame.mask.Mask] = {}
+        self.atlas: pygame.Surface | None = None
+        self.atlas_buffer: mmap.mmap | None = None
+        self.atlas_rects: dict[tuple, list[list[int]]] = {}
+
+        self.stats = {"hits": 0,
+                      "misses": 0,
+                      "bytes": 0}
+
+    def get_image(self, path: str) -> pygame.Surface:
+        """Function which returns the image at the given path, loading it only the first time."""
+        if path in self.images:
+            self.stats["hits"] += 1
+            return self.images[path]
+
+        self.stats["misses"] += 1
+        image = convert_image(pygame.image.load(path))
+        self.images[path] = image
+        self.stats["bytes"] += surface_size(image)
+
+        return image
+
+    def store_image(self, path: str, image: pygame.Surface) -> None:
+        """
+        Function which adds an image that was loaded elsewhere, for example on a loading thread.
+        It is converted here, so it has to be called on the main thread.
+        """
+        if path not in self.images:
+            image = convert_image(image)
+            self.images[path] = image
+            self.stats["bytes"] += surface_size(image)
+
+    def load_atlas(self, index_path: str = ATLAS_INDEX) -> int:
+        """
+        Function which takes the frames of every sheet that is up to date from the baked atlas,
+        so get_frames returns them without loading or slicing the sheets.
+        It returns the number of sheets taken from the atlas.
+        """
+        atlas = open_atlas(index_path)
+        if atlas is None:
+            return 0
+
+        self.atlas, self.atlas_buffer, sheets = atlas
+        self.stats["bytes"] += surface_size(self.atlas)
+        for entry in sheets:
+            key = (entry["path"], entry["frame_count"], tuple(entry["dimensions"]), entry["scale"])
+            self.atlas_rects[key] = entry["rects"]
+            self.frames[key] = self.atlas_frames(key)
+        return len(sheets)
+
+    def atlas_frames(self, key: tuple) -> list[pygame.Surface]:
+        """Function which cuts the frames of a sheet out of the atlas as color-keyed subsurfaces."""
+        frames = []
+        for rect in self.atlas_rects[key]:
+            frame = self.atlas.subsurface(rect)
+            frame.set_colorkey("Black")
+            frames.append(frame)
+        return frames
+
+    def has_frames(self, path: str) -> bool:
+        """
+        Function which returns whether frames of the sheet at the given path are ready
+        or can be cut out of the atlas without loading anything.
+        """
+        return (any(key[0] == path for key in self.frames)
+                or any(key[0] == path for key in self.atlas_rects))
+
+    def is_resident(self, path: str) -> bool:
+        """Function which returns whether an image or sheet can be used without loading it."""
+        return path in self.images or self.has_frames(path)
+
+    def get_frames(
+            self, path: str, frame_count: int,
+            dimensions: tuple[int, int], scale: int|float
+        ) -> list[pygame.Surface]:
+        """
+        Function which returns the list of frames sliced from a sprite sheet.
+        The sheet is sliced and scaled only the first time, after that
+        every caller receives the same list.
+        """
+        key = (path, frame_count, dimensions, scale)
+        if key in self.frames:
+            self.stats["hits"] += 1
+            return self.frames[key]
+        if key in self.atlas_rects:
+            self.frames[key] = self.atlas_frames(key)
+            return self.frames[key]
+
+        self.stats["misses"] += 1
+        sheet = self.get_image(path)
+        frames = [get_frame(sheet, i, dimensions, scale) for i in range(frame_count)]
+        self.frames[key] = frames
+        self.stats["bytes"] += sum(surface_size(frame) for frame in frames)
+
+        return frames
+
+    def get_mask(self, surface: pygame.Surface) -> pygame.mask.Mask:
+        """
+        Function which returns the collision mask of a surface,
+        building it only the first time the surface is asked for.
+        """
+        mask = self.masks.get(surface)
+        if mask is None:
+            mask = pygame.mask.from_surface(surface)
+            self.masks[surface] = mask
+            self.stats["bytes"] += surface.get_width() * surface.get_height() // 8
+        return mask
+
+    def release(self, paths: Iterable[str]) -> list[pygame.Surface]:
+        """
+        Function which forgets the images and the frames of the sheets at the given paths
+        together with their masks and returns the released surfaces.
+        Their memory is freed once no sprite uses them anymore.
+        """
+        released = []
+        for path in paths:
+            image = self.images.pop(path, None)
+            if image is not None:
+                released.append(image)
+            for key in [key for key in self.frames if key[0] == path]:
+                released.extend(self.frames.pop(key))
+        for surface in released:
+            self.masks.pop(surface, None)
+        return released
+
+    def resident_bytes(self) -> int:
+        """
+        Function which returns the memory used by the images, frames and masks kept right now.
+        Frames cut out of the atlas share its mapped pixels and are not counted.
+        """
+        size = sum(surface_size(image) for image in self.images.values())
+        size += sum(surface_size(frame) for frames in self.frames.values()
+                    for frame in frames if frame.get_parent() is None)
+        size += sum(surface.get_width() * surface.get_height() // 8 for surface in self.masks)
+        return size
+
+    def clear(self) -> None:
+        """Function which drops all cached surfaces and resets the counters."""
+        self.images.clear()
+        self.frames.clear()
+        self.masks.clear()
+        self.atlas = None
+        self.atlas_buffer = None
+        self.atlas_rects.clear()
+        self.stats = {"hits": 0,
+                      "misses": 0,
+                      "bytes": 0}
+
+
+def convert_image(image: pygame.Surface) -> pygame.Surface:
+    """
+    Function which converts a loaded image to the pixel format of the display.
+    Images without transparency, like the backgrounds, are kept opaque,
+    which makes drawing them several times faster than with an alpha channel.
+    """
+    if image.get_flags() & pygame.SRCALPHA or image.get_colorkey() is not None:
+        return image.convert_alpha()
+    return image.convert()
+
+
+def surface_size(surface: pygame.Surface) -> int:
+    """Function which returns the approximate memory used by a surface's pixels in bytes."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+assets = AssetRegistry()
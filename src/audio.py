@@ -0,0 +1,122 @@
+"""Module for music and sound effects"""
+import pygame
+
+class AudioManager():
+    """
+    Class which streams the music from its file and plays sound effects
+    on a fixed pool of reserved channels.
+    When every channel is busy, a new effect takes over the channel of the oldest effect
+    with a lower or equal priority, otherwise it is dropped.
+    """
+    def __init__(self, channel_count: int = 6) -> None:
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channel_count))
+        pygame.mixer.set_reserved(channel_count)
+
+        self.channels = [pygame.mixer.Channel(i) for i in range(channel_count)]
+        self.channel_state: list[tuple[int, int, str | None]] = [(0, 0, None)] * channel_count
+
+        self.sounds: dict[str, pygame.mixer.Sound] = {}
+        self.settings: dict[str, tuple[int, int]] = {}
+        self.sound_bytes = 0
+        self.play_count = 0
+
+        self.music_path: str | None = None
+        self.music_on = False
+
+        self.stats = {"played": 0,
+                      "stolen": 0,
+                      "dropped": 0}
+
+    def add_sound(
+            self, name: str, sound: pygame.mixer.Sound,
+            priority: int = 0, max_voices: int = 2
+        ) -> None:
+        """
+        Function which registers a sound effect with its priority
+        and the number of copies of it that may play at the same time.
+        """
+        self.sounds[name] = sound
+        self.settings[name] = (priority, max_voices)
+        self.sound_bytes += sound_size(sound)
+
+    def set_music(self, path: str) -> None:
+        """Function which sets the music file, which is streamed instead of loaded into memory."""
+        self.music_path = path
+        pygame.mixer.music.load(path)
+
+    def play_music(self) -> None:
+        """Function which starts the music on a loop if it is not playing already."""
+        if self.music_path is not None and not self.music_on:
+            pygame.mixer.music.play(loops = -1)
+        self.music_on = True
+
+    def stop_music(self) -> None:
+        """Function which stops the music."""
+        if self.music_on:
+            pygame.mixer.music.stop()
+        self.music_on = False
+
+    def play(self, name: str) -> None:
+        """
+        Function which plays a sound effect on a free channel.
+        If the effect already plays max_voices times, its oldest copy is restarted,
+        if no channel is free, the oldest effect with a lower or equal priority is replaced,
+        and otherwise the effect is dropped.
+        Effects that have not been added yet are ignored.
+        """
+        if name not in self.sounds:
+            return
+        priority, max_voices = self.settings[name]
+
+        voices = 0
+        free_channel = None
+        oldest_same = None
+        oldest_lower = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free_channel is None:
+                    free_channel = i
+                continue
+
+            channel_priority, started, channel_sound = self.channel_state[i]
+            if channel_sound == name:
+                voices += 1
+                if oldest_same is None or started < self.channel_state[oldest_same][1]:
+                    oldest_same = i
+            if channel_priority <= priority:
+                if oldest_lower is None or started < self.channel_state[oldest_lower][1]:
+                    oldest_lower = i
+
+        if voices >= max_voices:
+            index = oldest_same
+        elif free_channel is not None:
+            index = free_channel
+        else:
+            index = oldest_lower
+
+        if index is None:
+            self.stats["dropped"] += 1
+            return
+        if index != free_channel:
+            self.stats["stolen"] += 1
+
+        self.play_count += 1
+        self.channels[index].play(self.sounds[name])
+        self.channel_state[index] = (priority, self.play_count, name)
+        self.stats["played"] += 1
+
+    def active_voices(self) -> int:
+        """Function which returns how many effect channels are playing right now."""
+        return sum(1 for channel in self.channels if channel.get_busy())
+
+    def counters(self) -> dict[str, int]:
+        """Function which returns the memory used by the effects and the voice counters."""
+        return {"sound_bytes": self.sound_bytes,
+                "active_voices": self.active_voices(),
+                **self.stats}
+
+
+def sound_size(sound: pygame.mixer.Sound) -> int:
+    """Function which returns the memory used by a decoded sound in bytes."""
+    frequency, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency * channels * abs(size) // 8)
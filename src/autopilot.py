@@ -0,0 +1,148 @@
+"""Module for a scripted player used by simulations"""
+import argparse
+import pygame
+from .game_loop import GameLoop
+from .groups_and_collison import GroupsAndCollison
+from .input_state import ANY_KEY_BIT, KEY_BITS, MOUSE_BIT, InputState
+
+class Autopilot():
+    """
+    Class which plays the game with a few simple rules and returns the input of every tick.
+    In the first phase it jumps towards orbs that fly too high and attacks the ones it touches,
+    in the second phase it flies towards the nearest orb unless a fireball is in the way.
+    With retry_after it presses the retry button once the victory or game over screen
+    has been shown for that many ticks, so it keeps playing new runs.
+    """
+    def __init__(
+            self, jump_distance: int = 150, danger_distance: int = 400,
+            click_interval: int = 6, retry_after: int | None = None
+        ) -> None:
+        self.jump_distance = jump_distance
+        self.danger_distance = danger_distance
+        self.click_interval = click_interval
+        self.retry_after = retry_after
+
+        self.ticks_since_click = click_interval
+        self.ticks_on_screen = 0
+        self.direction = 0
+
+    def controls(self, game: GameLoop) -> InputState:
+        """Function which decides the input for the next tick of the given game."""
+        self.ticks_since_click += 1
+        phase = game.current_phase()
+        if phase == "first":
+            return self.phase_one(game.groups)
+        if phase == "second":
+            return self.phase_two(game.groups)
+        if phase in ("victory", "game_over") and self.retry_after is not None:
+            return self.end_screen(game)
+        return InputState()
+
+    def end_screen(self, game: GameLoop) -> InputState:
+        """Function which holds the mouse on the retry button once the screen has been shown."""
+        self.ticks_on_screen += 1
+        if self.ticks_on_screen <= self.retry_after:
+            return InputState()
+
+        self.ticks_on_screen = 0
+        return InputState(1 << MOUSE_BIT, game.hud_rects["retry_button"].center)
+
+    def phase_one(self, groups: GroupsAndCollison) -> InputState:
+        """Function which jumps for high orbs and attacks every orb the character touches."""
+        char_rect = groups.char1.rect
+        keys = []
+        clicks = 0
+        for orb_rect in groups.orb_rects():
+            if orb_rect.colliderect(char_rect):
+                if self.ticks_since_click >= self.click_interval:
+                    clicks = 1
+                    self.ticks_since_click = 0
+            elif (0 <= orb_rect.left - char_rect.right <= self.jump_distance
+                  and orb_rect.bottom < char_rect.top):
+                keys.append(pygame.K_SPACE)
+        return make_input(keys, clicks)
+
+    def phase_two(self, groups: GroupsAndCollison) -> InputState:
+        """
+        Function which moves the flying character up or down towards the nearest orb ahead,
+        or away from the nearest fireball heading at it.
+        Changing direction first releases every key, which stops the character.
+        """
+        char_rect = groups.char2.rect
+        target_y = None
+
+        ahead = [rect for rect in groups.fireball_rects()
+                 if 0 <= rect.left - char_rect.right <= self.danger_distance
+                 and rect.top < char_rect.bottom + 40 and rect.bottom > char_rect.top - 40]
+        if ahead:
+            fireball = min(ahead, key = lambda rect: rect.left)
+            if fireball.centery > char_rect.centery or char_rect.bottom >= 700:
+                target_y = fireball.top - char_rect.height
+            else:
+                target_y = fireball.bottom + char_rect.height
+        else:
+            orbs = [rect for rect in groups.orb_rects() if rect.right > char_rect.left]
+            if orbs:
+                target_y = min(orbs, key = lambda rect: rect.left).centery
+
+        direction = 0
+        if target_y is not None and abs(target_y - char_rect.centery) > 20:
+            direction = -1 if target_y < char_rect.centery else 1
+
+        if direction != self.direction and self.direction != 0:
+            self.direction = 0
+            return InputState()
+        self.direction = direction
+
+        if direction < 0:
+            return make_input([pygame.K_w])
+        if direction > 0:
+            return make_input([pygame.K_s])
+        return InputState()
+
+
+def make_input(keys: list[int], clicks: int = 0) -> InputState:
+    """Function which builds the input of a tick in which the given keys are held down."""
+    buttons = 0
+    for key in keys:
+        buttons |= 1 << KEY_BITS[key]
+    if keys:
+        buttons |= 1 << ANY_KEY_BIT
+    return InputState(buttons, (0, 0), clicks)
+
+
+def play_until(game: GameLoop, bar_length: float, max_ticks: int) -> bool:
+    """
+    Function which lets the autopilot play the game until the second phase is active
+    and the energy bar has reached the given length, and returns whether it got there.
+    """
+    pilot = Autopilot()
+    while game.frame < max_ticks and game.current_phase() in ("first", "second"):
+        if game.current_phase() == "second" and game.bar_length >= bar_length:
+            return True
+        game.frame_input = pilot.controls(game)
+        game.tick()
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play headless into a late phase-two state.")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--bar-length", type = float, default = 400,
+                        help = "energy the second phase should have reached")
+    parser.add_argument("--max-ticks", type = int, default = 60 * 600)
+    parser.add_argument("--output", default = "late_phase_two.bin")
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + 20)
+    for seed in seeds:
+        late_game = GameLoop(headless = True, seed = seed, scores_path = None)
+        if play_until(late_game, args.bar_length, args.max_ticks):
+            late_game.save_state(args.output)
+            print(f"Saved the state of seed {seed} after {late_game.frame} ticks "
+                  f"with {late_game.bar_length:.0f} energy to {args.output}")
+            break
+        late_game.scores.close()
+    else:
+        print(f"The autopilot did not reach {args.bar_length:g} energy with seeds "
+              f"{seeds.start} to {seeds.stop - 1}")
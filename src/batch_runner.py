@@ -0,0 +1,155 @@
+"""Module for running many simulated games in parallel to compare game parameters"""
+import argparse
+import csv
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import json
+import os
+import time
+from .autopilot import Autopilot
+from .benchmark import percentile
+from .game_loop import GameLoop
+from .spawn_scheduler import SpawnScheduler, load_waves
+
+PARAMETERS = ("bar_drain", "orb_reward", "fireball_penalty", "interval_scale")
+
+
+def run_session(job: dict) -> dict:
+    """
+    Function which plays one seeded headless game with the autopilot
+    until it is won, lost or max_ticks have passed, and returns its results.
+    """
+    game = GameLoop(headless = True, seed = job["seed"], waves_path = job["waves"],
+                    scores_path = None)
+    game.bar_drain = job["bar_drain"]
+    game.rewards["orb"] = job["orb_reward"]
+    game.rewards["fireball"] = -job["fireball_penalty"]
+    game.spawner = SpawnScheduler(load_waves(job["waves"]), game.tick_rate,
+                                  job["interval_scale"])
+    pilot = Autopilot()
+
+    frame_times = []
+    peak_orbs = 0
+    peak_fireballs = 0
+    reached_phase_two = False
+    while game.current_phase() in ("first", "second") and game.frame < job["max_ticks"]:
+        start = time.perf_counter()
+        game.frame_input = pilot.controls(game)
+        game.tick()
+        if job["draw"]:
+            game.render(1.0)
+        frame_times.append((time.perf_counter() - start) * 1000)
+
+        peak_orbs = max(peak_orbs, game.groups.count_orbs())
+        peak_fireballs = max(peak_fireballs, game.groups.count_fireballs())
+        reached_phase_two = reached_phase_two or game.current_phase() == "second"
+
+    outcome = game.current_phase()
+    if outcome in ("first", "second"):
+        outcome = "timeout"
+    game.scores.close()
+
+    frame_times.sort()
+    return {**{name: job[name] for name in PARAMETERS},
+            "seed": job["seed"],
+            "outcome": outcome,
+            "reached_phase_two": reached_phase_two,
+            "time": game.elapsed_time() if outcome == "timeout" else game.final_time,
+            "ticks": game.frame,
+            "peak_orbs": peak_orbs,
+            "peak_fireballs": peak_fireballs,
+            "mean_frame_ms": sum(frame_times) / len(frame_times) if frame_times else 0.0,
+            "p95_frame_ms": percentile(frame_times, 95) if frame_times else 0.0}
+
+
+def summarize_sessions(sessions: list[dict]) -> list[dict]:
+    """Function which combines the sessions of every parameter combination into one row."""
+    groups: dict[tuple, list[dict]] = {}
+    for session in sessions:
+        groups.setdefault(tuple(session[name] for name in PARAMETERS), []).append(session)
+
+    rows = []
+    for key, group in groups.items():
+        count = len(group)
+        wins = [session for session in group if session["outcome"] == "victory"]
+        rows.append({**dict(zip(PARAMETERS, key)),
+                     "sessions": count,
+                     "win_rate": len(wins) / count,
+                     "phase_two_rate": sum(s["reached_phase_two"] for s in group) / count,
+                     "timeout_rate": sum(s["outcome"] == "timeout" for s in group) / count,
+                     "mean_win_time": (sum(s["time"] for s in wins) / len(wins)
+                                       if wins else None),
+                     "mean_time": sum(s["time"] for s in group) / count,
+                     "mean_peak_orbs": sum(s["peak_orbs"] for s in group) / count,
+                     "mean_peak_fireballs": sum(s["peak_fireballs"] for s in group) / count,
+                     "mean_frame_ms": sum(s["mean_frame_ms"] for s in group) / count,
+                     "p95_frame_ms": percentile(sorted(s["p95_frame_ms"] for s in group), 95)})
+    return rows
+
+
+def main() -> None:
+    """
+    Function which parses the command line, runs every seed for every combination
+    of the given parameters in a process pool and writes the summaries.
+    """
+    parser = argparse.ArgumentParser(description = "Simulate many games to compare parameters.")
+    parser.add_argument("--seeds", type = int, default = 20,
+                        help = "number of seeded sessions for every parameter combination")
+    parser.add_argument("--first-seed", type = int, default = 0)
+    parser.add_argument("--bar-drain", type = float, nargs = "+", default = [15],
+                        help = "energy lost per second")
+    parser.add_argument("--orb-reward", type = float, nargs = "+", default = [30])
+    parser.add_argument("--fireball-penalty", type = float, nargs = "+", default = [20])
+    parser.add_argument("--interval-scale", type = float, nargs = "+", default = [1.0],
+                        help = "multiplier for every spawn interval of the waves")
+    parser.add_argument("--waves", default = "waves.json")
+    parser.add_argument("--max-ticks", type = int, default = 60 * 180)
+    parser.add_argument("--draw", action = "store_true",
+                        help = "also draw every frame, so frame times include rendering")
+    parser.add_argument("--workers", type = int, default = os.cpu_count())
+    parser.add_argument("--csv", default = "sweep.csv")
+    parser.add_argument("--output", default = "sweep.json")
+    args = parser.parse_args()
+
+    jobs = [{"bar_drain": bar_drain,
+             "orb_reward": orb_reward,
+             "fireball_penalty": fireball_penalty,
+             "interval_scale": interval_scale,
+             "seed": seed,
+             "waves": args.waves,
+             "max_ticks": args.max_ticks,
+             "draw": args.draw}
+            for bar_drain, orb_reward, fireball_penalty, interval_scale, seed in itertools.product(
+                args.bar_drain, args.orb_reward, args.fireball_penalty, args.interval_scale,
+                range(args.first_seed, args.first_seed + args.seeds))]
+
+    start = time.perf_counter()
+    sessions = []
+    with ProcessPoolExecutor(max_workers = args.workers) as executor:
+        chunksize = max(1, len(jobs) // (args.workers * 4))
+        for session in executor.map(run_session, jobs, chunksize = chunksize):
+            sessions.append(session)
+            if len(sessions) % 100 == 0:
+                print(f"{len(sessions)}/{len(jobs)} sessions")
+    elapsed = time.perf_counter() - start
+
+    rows = summarize_sessions(sessions)
+    with open(args.csv, "w", newline = "", encoding = "utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames = list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(args.output, "w", encoding = "utf-8") as file:
+        json.dump({"workers": args.workers,
+                   "seconds": elapsed,
+                   "summary": rows,
+                   "sessions": sessions}, file, indent = 2)
+
+    for row in rows:
+        parameters = ", ".join(f"{name} {row[name]:g}" for name in PARAMETERS)
+        print(f"{parameters}: win rate {row['win_rate']:.0%}, "
+              f"mean frame {row['mean_frame_ms']:.3f} ms")
+    print(f"{len(sessions)} sessions in {elapsed:.1f} s on {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
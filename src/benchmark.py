@@ -0,0 +1,218 @@
+"""
+Module for benchmarking the per-frame cost of each game phase.
+
+Run it from the project folder with:
+    python -m src.benchmark --frames 600 --output benchmark.json
+and compare against an earlier run with --baseline old.json.
+"""
+import argparse
+import json
+import platform
+import sys
+import pygame
+from .frame_timer import FrameTimer
+from .game_loop import GameLoop
+from .viewport import WORLD_HEIGHT, WORLD_WIDTH, parse_size
+
+SECTIONS = ("background", "bar_progress", "hud", "sprite_update",
+            "sprite_draw", "collision", "total")
+
+SCENARIOS = {
+    "phase_one_10_orbs": {"phase": "first", "orbs": 10, "fireballs": 0},
+    "phase_one_200_orbs": {"phase": "first", "orbs": 200, "fireballs": 0},
+    "phase_two_10_orbs_10_fireballs": {"phase": "second", "orbs": 10, "fireballs": 10},
+    "phase_two_200_orbs_100_fireballs": {"phase": "second", "orbs": 200, "fireballs": 100},
+    "phase_two_2000_orbs_1000_fireballs": {"phase": "second", "orbs": 2000, "fireballs": 1000},
+    "victory_screen": {"phase": "victory", "orbs": 0, "fireballs": 0},
+    "game_over_screen": {"phase": "game_over", "orbs": 0, "fireballs": 0},
+}
+
+
+def set_phase(game: GameLoop, phase: str) -> None:
+    """Function which puts the game directly into the scene of the given phase."""
+    if game.current_phase() != phase:
+        game.change_scene(phase)
+
+
+def fill_hazards(game: GameLoop, scenario: dict) -> None:
+    """
+    Function which tops the orb and fireball groups up to the counts of the scenario
+    and keeps the energy bar inside the phase so the scenario never ends on its own.
+    """
+    if scenario["phase"] == "first":
+        game.bar_length = 200
+        while game.groups.count_orbs() < scenario["orbs"]:
+            game.groups.spawn_orb((0, 1500), (250, 475), 600)
+    elif scenario["phase"] == "second":
+        game.bar_length = 300
+        while game.groups.count_orbs() < scenario["orbs"]:
+            game.groups.spawn_orb((0, 1700), (200, 600), 1200)
+        while game.groups.count_fireballs() < scenario["fireballs"]:
+            game.groups.spawn_fireball((0, 1700), (250, 600), 1500)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Function which returns the given percentile of a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(frames: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    """Function which turns the frame timings into mean, p95 and p99 per section in milliseconds."""
+    summary = {}
+    for section in SECTIONS:
+        values = [frame.get(section, 0.0) * 1000 for frame in frames]
+        summary[section] = {"mean": sum(values) / len(values),
+                            "p95": percentile(values, 95),
+                            "p99": percentile(values, 99)}
+    return summary
+
+
+def run_scenario(
+        name: str, frames: int, seed: int,
+        entity_store: bool = False, render_size: tuple[int, int] = (WORLD_WIDTH, WORLD_HEIGHT)
+    ) -> dict[str, dict[str, float]]:
+    """Function which runs one scenario headless and returns its summary."""
+    scenario = SCENARIOS[name]
+    game = GameLoop(headless = True, seed = seed, entity_store = entity_store,
+                    scores_path = None, render_size = render_size, window_size = render_size)
+    game.finish_loading()
+    game.frame_timer = FrameTimer(enabled = True)
+    set_phase(game, scenario["phase"])
+
+    for _ in range(frames):
+        fill_hazards(game, scenario)
+        game.frame_timer.begin_frame()
+        game.update_phases()
+        game.draw_phases()
+        game.frame_timer.end_frame()
+        game.frame += 1
+
+    return summarize(game.frame_timer.frames)
+
+
+def run_replay(path: str, entity_store: bool = False) -> dict[str, dict[str, float]]:
+    """
+    Function which replays a recorded session headless from start to end
+    and returns the summary of its frame times.
+    """
+    game = GameLoop(headless = True, entity_store = entity_store, scores_path = None,
+                    replay_path = path)
+    game.frame_timer = FrameTimer(enabled = True)
+    while not game.replay.done():
+        game.step()
+    return summarize(game.frame_timer.frames)
+
+
+def run_state(
+        path: str, frames: int, entity_store: bool = False,
+        render_size: tuple[int, int] = (WORLD_WIDTH, WORLD_HEIGHT)
+    ) -> dict[str, dict[str, float]]:
+    """
+    Function which continues a game from a saved state headless for the given number of frames
+    and returns the summary of its frame times.
+    """
+    game = GameLoop(headless = True, entity_store = entity_store, scores_path = None,
+                    render_size = render_size, window_size = render_size)
+    game.load_state(path)
+    game.frame_timer = FrameTimer(enabled = True)
+    game.step(frames)
+    return summarize(game.frame_timer.frames)
+
+
+def measure_startup(seed: int) -> dict[str, float]:
+    """
+    Function which measures how long a headless game takes to draw its first frame
+    and to finish loading every asset, in milliseconds,
+    together with the memory used by the decoded sound effects in bytes.
+    """
+    game = GameLoop(headless = True, seed = seed, scores_path = None)
+    game.step()
+    game.finish_loading()
+    return {"first_frame": game.startup_stats["first_frame"] * 1000,
+            "all_loaded": game.startup_stats["all_loaded"] * 1000,
+            "sound_bytes": game.audio.counters()["sound_bytes"]}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Function which compares mean frame times with a baseline run
+    and returns a message for every scenario that got slower than the threshold.
+    """
+    regressions = []
+    for name, summary in results["scenarios"].items():
+        if name not in baseline["scenarios"]:
+            continue
+        old = baseline["scenarios"][name]["total"]["mean"]
+        new = summary["total"]["mean"]
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"{name}: {old:.3f} ms -> {new:.3f} ms ({change:+.1f}%)")
+        if change > threshold:
+            regressions.append(f"{name} is {change:.1f}% slower")
+    return regressions
+
+
+def main() -> None:
+    """Function which parses the command line, runs the scenarios and writes the results."""
+    parser = argparse.ArgumentParser(description = "Benchmark the per-frame cost of the game.")
+    parser.add_argument("--frames", type = int, default = 600)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--scenario", action = "append", choices = SCENARIOS)
+    parser.add_argument("--output", default = "benchmark.json")
+    parser.add_argument("--entity-store", action = "store_true",
+                        help = "keep orbs and fireballs in NumPy arrays instead of sprites")
+    parser.add_argument("--render-size", type = parse_size, default = (WORLD_WIDTH, WORLD_HEIGHT),
+                        help = "resolution the scenarios are drawn at")
+    parser.add_argument("--replay", help = "also time a session recorded with main.py --record")
+    parser.add_argument("--state", help = "also time the game continued from a saved state")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type = float, default = 10.0,
+                        help = "allowed slowdown in percent before failing")
+    args = parser.parse_args()
+
+    results = {"python": platform.python_version(),
+               "pygame": pygame.version.ver,
+               "frames": args.frames,
+               "seed": args.seed,
+               "entity_store": args.entity_store,
+               "render_size": list(args.render_size),
+               "startup": measure_startup(args.seed),
+               "scenarios": {}}
+    print(f"startup: first frame {results['startup']['first_frame']:.1f} ms, "
+          f"all loaded {results['startup']['all_loaded']:.1f} ms")
+
+    for name in args.scenario or SCENARIOS:
+        summary = run_scenario(name, args.frames, args.seed, args.entity_store,
+                               args.render_size)
+        results["scenarios"][name] = summary
+        print(f"{name}: mean {summary['total']['mean']:.3f} ms, "
+              f"p95 {summary['total']['p95']:.3f} ms, p99 {summary['total']['p99']:.3f} ms")
+
+    if args.replay:
+        summary = run_replay(args.replay, args.entity_store)
+        results["scenarios"]["replay"] = summary
+        print(f"replay: mean {summary['total']['mean']:.3f} ms, "
+              f"p95 {summary['total']['p95']:.3f} ms, p99 {summary['total']['p99']:.3f} ms")
+
+    if args.state:
+        summary = run_state(args.state, args.frames, args.entity_store, args.render_size)
+        results["scenarios"]["state"] = summary
+        print(f"state: mean {summary['total']['mean']:.3f} ms, "
+              f"p95 {summary['total']['p95']:.3f} ms, p99 {summary['total']['p99']:.3f} ms")
+
+    with open(args.output, "w", encoding = "utf-8") as file:
+        json.dump(results, file, indent = 2)
+
+    if args.baseline:
+        with open(args.baseline, encoding = "utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"Regression: {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
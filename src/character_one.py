@@ -1,6 +1,9 @@
 """Module for player character in the first phase of the game"""
 import pygame
-from .helper_funcs import get_frame
+from .asset_registry import assets
+from .helper_funcs import image_number
+from .input_state import InputState
+from .viewport import WORLD_WIDTH
 
 class CharacterOne(pygame.sprite.Sprite):
     """Class which represents the player character in the first phase."""
@@ -9,19 +12,10 @@ class CharacterOne(pygame.sprite.Sprite):
     def __init__(self) -> None:
         super().__init__()
 
-        self.sheets = {
-            "run_sheet": pygame.image.load("gfx/char_phase_one/Run.png").convert_alpha(),
-            "jump_sheet": pygame.image.load("gfx/char_phase_one/Jump.png").convert_alpha(),
-            "attack_sheet": pygame.image.load("gfx/char_phase_one/Attack.png").convert_alpha()
-        }
-
         self.frames = {
-            "run_frames": 
-                [get_frame(self.sheets["run_sheet"], i, (42, 42), 4) for i in range(6)],
-            "jump_frames": 
-                [get_frame(self.sheets["jump_sheet"], i, (42, 42), 4) for i in range(8)],
-            "attack_frames": 
-                [get_frame(self.sheets["attack_sheet"], i, (42, 42), 4) for i in range(6)]
+            "run_frames": assets.get_frames("gfx/char_phase_one/Run.png", 6, (42, 42), 4),
+            "jump_frames": assets.get_frames("gfx/char_phase_one/Jump.png", 8, (42, 42), 4),
+            "attack_frames": assets.get_frames("gfx/char_phase_one/Attack.png", 6, (42, 42), 4)
         }
 
         self.indexes = {
@@ -30,48 +24,53 @@ class CharacterOne(pygame.sprite.Sprite):
             "left_clicked": False
         }
         self.coords_change = [0.0, 0.0]
+        self.speeds = {"run_acceleration": 900,
+                       "jump": 1500,
+                       "gravity": 3600}
 
         self.start_coords = (90, 605)
 
         self.image = self.frames["run_frames"][int(self.indexes["frame_index"])]
         self.rect = self.image.get_rect(midbottom = (self.start_coords[0], self.start_coords[1]))
+        self.previous = self.rect.topleft
 
-    def input(self) -> None:
-        """Function which tracks player input"""
-        keys = pygame.key.get_pressed()
-        mouse = pygame.mouse.get_pressed()
-        if keys[pygame.K_SPACE] and self.rect.bottom >= 605:
-            self.coords_change[1] = -25
+    def input(self, dt: float, controls: InputState) -> None:
+        """
+        Function which tracks player input from the snapshot of the current tick.
+        The velocity in coords_change is kept in pixels per second.
+        """
+        if controls.pressed(pygame.K_SPACE) and self.rect.bottom >= 605:
+            self.coords_change[1] = -self.speeds["jump"]
 
-        if keys[pygame.K_d]:
-            self.coords_change[0] += 0.25
+        if controls.pressed(pygame.K_d):
+            self.coords_change[0] += self.speeds["run_acceleration"] * dt
 
-        if keys[pygame.K_a]:
-            self.coords_change[0] -= 0.25
+        if controls.pressed(pygame.K_a):
+            self.coords_change[0] -= self.speeds["run_acceleration"] * dt
 
-        if not any(keys):
+        if not controls.any_key():
             self.coords_change[0] = 0
 
-        if mouse[0]:
+        if controls.mouse_held():
             self.indexes["left_clicked"] = True
 
 
-    def apply_movement(self) -> None:
+    def apply_movement(self, dt: float) -> None:
         """
         Function which moves the player character depending on what is pressed
         and sets boundaries on the screen so the player character cannot leave it.
         """
         if self.rect.left < 0:
             self.rect.left = 0
-        elif self.rect.right > 1280:
-            self.rect.right = 1280
+        elif self.rect.right > WORLD_WIDTH:
+            self.rect.right = WORLD_WIDTH
 
-        self.coords_change[1] += 1
-        self.rect.y += int(self.coords_change[1])
+        self.coords_change[1] += self.speeds["gravity"] * dt
+        self.rect.y += int(self.coords_change[1] * dt)
 
         self.rect.bottom = min(self.rect.bottom, 605)
 
-        self.rect.x += int(self.coords_change[0])
+        self.rect.x += int(self.coords_change[0] * dt)
 
     def animation(self) -> None:
         """Function which animates the character sprite depending on player input."""
@@ -92,12 +91,33 @@ class CharacterOne(pygame.sprite.Sprite):
                 self.indexes["frame_index"] = 0
             self.image = self.frames["run_frames"][int(self.indexes["frame_index"])]
 
+    def get_state(self) -> tuple:
+        """Function which returns everything needed to put the character back in this state."""
+        image = image_number(self.frames, self.image)
+        return (*self.rect.topleft, *self.previous, *self.coords_change,
+                self.indexes["frame_index"], self.indexes["attack_frame_index"],
+                self.indexes["left_clicked"], *image)
+
+    def set_state(self, state: tuple) -> None:
+        """Function which puts the character back in a state returned by get_state."""
+        (x, y, previous_x, previous_y, speed_x, speed_y, frame_index, attack_frame_index,
+         left_clicked, frame_list, frame_number) = state
+        self.rect.topleft = (x, y)
+        self.previous = (previous_x, previous_y)
+        self.coords_change = [speed_x, speed_y]
+        self.indexes = {"frame_index": frame_index,
+                        "attack_frame_index": attack_frame_index,
+                        "left_clicked": left_clicked}
+        self.image = list(self.frames.values())[frame_list][frame_number]
+
     def reset(self) -> None:
         """Function which returns player character at the starting position upon restart."""
         self.rect.midbottom = (self.start_coords[0], self.start_coords[1])
+        self.previous = self.rect.topleft
 
-    def update(self) -> None:
-        """Function to update the player character for each frame of the game."""
-        self.input()
-        self.apply_movement()
+    def update(self, dt: float, controls: InputState) -> None:
+        """Function to update the player character for each simulation tick."""
+        self.previous = self.rect.topleft
+        self.input(dt, controls)
+        self.apply_movement(dt)
         self.animation()
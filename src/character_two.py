@@ -1,6 +1,9 @@
 """Module for player character in the second phase of the game"""
 import pygame
-from .helper_funcs import get_frame
+from .asset_registry import assets
+from .helper_funcs import image_number
+from .input_state import InputState
+from .viewport import WORLD_HEIGHT, WORLD_WIDTH
 
 class CharacterTwo(pygame.sprite.Sprite):
     """Class which represents the player character in the second phase."""
@@ -9,81 +12,76 @@ class CharacterTwo(pygame.sprite.Sprite):
     def __init__(self) -> None:
         super().__init__()
 
-        self.sheets = {
-            "fly_n_sheet": pygame.image.load("gfx/char_phase_two/fly_n.png").convert_alpha(),
-            "fly_up_sheet": pygame.image.load("gfx/char_phase_two/fly_up.png").convert_alpha(),
-            "fly_down_sheet": pygame.image.load("gfx/char_phase_two/fly_down.png").convert_alpha()
-        }
-
         self.frames = {
-            "fly_n_frames": 
-                [get_frame(self.sheets["fly_n_sheet"], i, (52, 28), 3.5) for i in range(3)],
-            "fly_up_frames": 
-                [get_frame(self.sheets["fly_up_sheet"], i, (48, 28), 3.5) for i in range(4)],
-            "fly_down_frames": 
-                [get_frame(self.sheets["fly_down_sheet"], i, (51, 28), 3.5) for i in range(4)]
+            "fly_n_frames": assets.get_frames("gfx/char_phase_two/fly_n.png", 3, (52, 28), 3.5),
+            "fly_up_frames": assets.get_frames("gfx/char_phase_two/fly_up.png", 4, (48, 28), 3.5),
+            "fly_down_frames":
+                assets.get_frames("gfx/char_phase_two/fly_down.png", 4, (51, 28), 3.5)
         }
 
         self.frame_index = 0.0
 
         self.coords_change = [0.0, 0.0]
+        self.acceleration = 1080
 
         self.start_coords = (120, 400)
 
         self.image = self.frames["fly_n_frames"][int(self.frame_index)]
         self.rect = self.image.get_rect(midbottom = (self.start_coords[0], self.start_coords[1]))
+        self.previous = self.rect.topleft
 
-    def input(self) -> None:
-        """Function which tracks player input."""
-        keys = pygame.key.get_pressed()
+    def input(self, dt: float, controls: InputState) -> None:
+        """
+        Function which tracks player input from the snapshot of the current tick.
+        The velocity in coords_change is kept in pixels per second.
+        """
+        speed_change = self.acceleration * dt
 
-        if keys[pygame.K_w]:
-            self.coords_change[1] -= 0.30
+        if controls.pressed(pygame.K_w):
+            self.coords_change[1] -= speed_change
 
-        if keys[pygame.K_s]:
-            self.coords_change[1] += 0.30
+        if controls.pressed(pygame.K_s):
+            self.coords_change[1] += speed_change
 
-        if keys[pygame.K_d]:
-            self.coords_change[0] += 0.30
+        if controls.pressed(pygame.K_d):
+            self.coords_change[0] += speed_change
 
-        if keys[pygame.K_a]:
-            self.coords_change[0] -= 0.30
+        if controls.pressed(pygame.K_a):
+            self.coords_change[0] -= speed_change
 
-        if not any(keys):
+        if not controls.any_key():
             self.coords_change[0] = 0
             self.coords_change[1] = 0
 
-    def apply_movement(self) -> None:
+    def apply_movement(self, dt: float) -> None:
         """
         Function which moves the player character depending on what is pressed
         and sets boundaries on the screen so the player character cannot leave it.
         """
         if self.rect.left < 0:
             self.rect.left = 0
-        elif self.rect.right > 1280:
-            self.rect.right = 1280
-        elif self.rect.bottom > 720:
-            self.rect.bottom = 720
+        elif self.rect.right > WORLD_WIDTH:
+            self.rect.right = WORLD_WIDTH
+        elif self.rect.bottom > WORLD_HEIGHT:
+            self.rect.bottom = WORLD_HEIGHT
         elif self.rect.top < 0:
             self.rect.top = 0
 
 
-        self.rect.x += int(self.coords_change[0])
-        self.rect.y += int(self.coords_change[1])
+        self.rect.x += int(self.coords_change[0] * dt)
+        self.rect.y += int(self.coords_change[1] * dt)
 
-    def animation(self) -> None:
+    def animation(self, controls: InputState) -> None:
         """
         Function which animates the character sprite depending on player input 
         by going trough the respective list of frames.
         """
-        keys = pygame.key.get_pressed()
-
-        if keys[pygame.K_w]:
+        if controls.pressed(pygame.K_w):
             self.frame_index += 0.2
             if self.frame_index >= len(self.frames["fly_up_frames"]):
                 self.frame_index = 0
             self.image = self.frames["fly_up_frames"][int(self.frame_index)]
-        elif keys[pygame.K_s]:
+        elif controls.pressed(pygame.K_s):
             self.frame_index += 0.1
             if self.frame_index >= len(self.frames["fly_down_frames"]):
                 self.frame_index = 0
@@ -94,12 +92,29 @@ class CharacterTwo(pygame.sprite.Sprite):
                 self.frame_index = 0
             self.image = self.frames["fly_n_frames"][int(self.frame_index)]
 
+    def get_state(self) -> tuple:
+        """Function which returns everything needed to put the character back in this state."""
+        image = image_number(self.frames, self.image)
+        return (*self.rect.topleft, *self.previous, *self.coords_change, self.frame_index, *image)
+
+    def set_state(self, state: tuple) -> None:
+        """Function which puts the character back in a state returned by get_state."""
+        (x, y, previous_x, previous_y, speed_x, speed_y, frame_index,
+         frame_list, frame_number) = state
+        self.rect.topleft = (x, y)
+        self.previous = (previous_x, previous_y)
+        self.coords_change = [speed_x, speed_y]
+        self.frame_index = frame_index
+        self.image = list(self.frames.values())[frame_list][frame_number]
+
     def reset(self) -> None:
         """Function which returns player character at the starting position upon restart."""
         self.rect.midbottom = (self.start_coords[0], self.start_coords[1])
-
-    def update(self) -> None:
-        """Function to update the player character for each frame of the game."""
-        self.input()
-        self.apply_movement()
-        self.animation()
+        self.previous = self.rect.topleft
+
+    def update(self, dt: float, controls: InputState) -> None:
+        """Function to update the player character for each simulation tick."""
+        self.previous = self.rect.topleft
+        self.input(dt, controls)
+        self.apply_movement(dt)
+        self.animation(controls)
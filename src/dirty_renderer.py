@@ -0,0 +1,68 @@
+"""Module for pushing only the changed parts of the screen to the display"""
+import pygame
+
+class DirtyRenderer():
+    """
+    Class which collects the rects that changed during a frame
+    and updates only those on the display.
+    Scrolling phases redraw the whole screen, while static screens
+    are drawn once and afterwards only their changed parts are pushed.
+    """
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+
+        self.rects: list[pygame.Rect] = []
+        self.full = True
+        self.static_screen: str | None = None
+
+        self.stats = {"full_frames": 0,
+                      "partial_frames": 0,
+                      "skipped_frames": 0}
+
+    def begin_scrolling(self) -> None:
+        """Function which tells the renderer that the whole screen changes this frame."""
+        self.static_screen = None
+        self.full = True
+
+    def begin_static(self, name: str) -> bool:
+        """
+        Function which tells the renderer that a static screen is shown this frame
+        and returns whether the screen has to be drawn again.
+        """
+        if not self.enabled:
+            self.full = True
+            return True
+        if self.static_screen == name:
+            return False
+
+        self.static_screen = name
+        self.full = True
+        return True
+
+    def invalidate(self) -> None:
+        """Function which forces the next static screen to be drawn again completely."""
+        self.static_screen = None
+        self.full = True
+
+    def mark(self, rect: pygame.Rect) -> None:
+        """Function which marks a part of the screen as changed."""
+        if self.enabled and not self.full:
+            self.rects.append(rect)
+
+    def pending(self) -> bool:
+        """Function which returns whether anything has to be pushed to the display this frame."""
+        return self.full or bool(self.rects) or not self.enabled
+
+    def flush(self) -> None:
+        """Function which pushes the changed parts of the screen to the display."""
+        if self.full or not self.enabled:
+            pygame.display.update()
+            self.stats["full_frames"] += 1
+        elif self.rects:
+            pygame.display.update(self.rects)
+            self.stats["partial_frames"] += 1
+        else:
+            self.stats["skipped_frames"] += 1
+
+        self.rects.clear()
+        self.full = False
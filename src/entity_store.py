@@ -0,0 +1,148 @@
+"""Module for storing many orbs or fireballs in NumPy arrays"""
+from random import randint
+import pygame
+from .viewport import Viewport
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class EntityStore():
+    """
+    Class which keeps the positions, velocities, animation indexes and alive flags
+    of many identical entities in arrays, so they are moved, culled, animated
+    and drawn in one step per frame instead of one sprite at a time.
+    The animation moves on every tick, but with an animation interval above one
+    the drawn frames only catch up with it every that many ticks.
+    """
+    def __init__(
+            self, frames: list[pygame.Surface], capacity: int = 4096,
+            animation_speed: float = 0.0
+        ) -> None:
+        if np is None:
+            raise ImportError("The entity store needs numpy, install it with: pip install numpy")
+
+        self.frames = frames
+        self.capacity = capacity
+        self.animation_speed = animation_speed
+        self.animation_interval = 1
+        self.animation_ticks = 0
+        self.width, self.height = frames[0].get_size()
+
+        self.x = np.zeros(capacity, dtype = np.float32)
+        self.previous_x = np.zeros(capacity, dtype = np.float32)
+        self.y = np.zeros(capacity, dtype = np.float32)
+        self.velocity = np.zeros(capacity, dtype = np.float32)
+        self.frame_index = np.zeros(capacity, dtype = np.float32)
+        self.drawn_frame = np.zeros(capacity, dtype = np.float32)
+        self.alive = np.zeros(capacity, dtype = bool)
+
+        # scratch arrays for the per-frame math, so it does not allocate temporary arrays
+        self.scratch = np.zeros(capacity, dtype = np.float32)
+        self.mask = np.zeros(capacity, dtype = bool)
+        self.hit = np.zeros(capacity, dtype = bool)
+
+        self.stats = {"spawned": 0,
+                      "overflow": 0}
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    def spawn(self, x: float, y: float, velocity: float = 0.0) -> int:
+        """
+        Function which places a new entity in the first free slot and returns its index,
+        or -1 if every slot is taken.
+        """
+        # the first False of the alive flags is the first free slot
+        index = int(self.alive.argmin())
+        if self.alive[index]:
+            self.stats["overflow"] += 1
+            return -1
+
+        self.x[index] = x
+        self.previous_x[index] = x
+        self.y[index] = y
+        self.velocity[index] = velocity
+        self.frame_index[index] = 0.0
+        self.drawn_frame[index] = 0.0
+        self.alive[index] = True
+        self.stats["spawned"] += 1
+        return index
+
+    def spawn_random(
+            self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int],
+            velocity: float = 0.0
+        ) -> int:
+        """Function which spawns an entity at a random position in the given ranges."""
+        return self.spawn(randint(*rand_x_coord), randint(*rand_y_coord), velocity)
+
+    def update(self, dt: float) -> None:
+        """
+        Function which moves every entity left by its own velocity in pixels per second,
+        removes the ones that left the screen and advances their animation.
+        """
+        np.copyto(self.previous_x, self.x)
+        np.multiply(self.velocity, dt, out = self.scratch)
+        self.x -= self.scratch
+        np.greater(self.x, -100, out = self.mask)
+        self.alive &= self.mask
+        if self.animation_speed:
+            self.frame_index += self.animation_speed
+            self.frame_index %= len(self.frames)
+            self.animation_ticks += 1
+            if self.animation_ticks >= self.animation_interval:
+                np.copyto(self.drawn_frame, self.frame_index)
+                self.animation_ticks = 0
+
+    def draw(
+            self, surface: pygame.Surface, alpha: float = 1.0,
+            view: Viewport | None = None
+        ) -> None:
+        """
+        Function which draws every alive entity with a single blits call,
+        between its previous and current position depending on alpha,
+        scaled to the render resolution of the viewport if one is given.
+        """
+        indexes = np.flatnonzero(self.alive)
+        if indexes.size == 0:
+            return
+
+        frames = self.frames
+        scale = 1
+        if view is not None:
+            frames = [view.image(frame) for frame in frames]
+            scale = view.scale
+        frame_numbers = self.drawn_frame[indexes].astype(np.int32).tolist()
+        previous_x = self.previous_x[indexes]
+        x = (previous_x + (self.x[indexes] - previous_x) * alpha) * scale
+        positions = zip(x.astype(np.int32).tolist(),
+                        (self.y[indexes] * scale).astype(np.int32).tolist())
+        surface.blits([(frames[number], position)
+                       for number, position in zip(frame_numbers, positions)], False)
+
+    def collide(self, rect: pygame.Rect) -> list[int]:
+        """Function which removes every entity that overlaps the rect and returns their indexes."""
+        hit, mask, scratch = self.hit, self.mask, self.scratch
+        np.less(self.x, rect.right, out = hit)
+        hit &= self.alive
+        np.add(self.x, self.width, out = scratch)
+        hit &= np.greater(scratch, rect.left, out = mask)
+        hit &= np.less(self.y, rect.bottom, out = mask)
+        np.add(self.y, self.height, out = scratch)
+        hit &= np.greater(scratch, rect.top, out = mask)
+        if not hit.any():
+            return []
+
+        indexes = np.flatnonzero(hit)
+        self.alive[indexes] = False
+        return indexes.tolist()
+
+    def rects(self) -> list[pygame.Rect]:
+        """Function which returns the rects of all living entities."""
+        return [pygame.Rect(int(x), int(y), self.width, self.height)
+                for x, y in zip(self.x[self.alive], self.y[self.alive])]
+
+    def clear(self) -> None:
+        """Function which removes every entity."""
+        self.alive[:] = False
@@ -1,7 +1,7 @@
 """Module for firaball obstacle in the second phase"""
 from random import randint
 import pygame
-from .helper_funcs import get_frame
+from .asset_registry import assets
 
 class FireBall(pygame.sprite.Sprite):
     """Class which represents the fireballs in the second phase of the game."""
@@ -10,28 +10,68 @@ class FireBall(pygame.sprite.Sprite):
     def __init__(self) -> None:
         super().__init__()
 
-        self.sheet = pygame.image.load("gfx/fireball.png").convert_alpha()
-        self.frames = [get_frame(self.sheet, i, (63, 43), 4) for i in range(8)]
+        self.pool = None
+
+        self.frames = assets.get_frames("gfx/fireball.png", 8, (63, 43), 4)
 
         self.frame_index = 0.0
+        self.animation_ticks = 0
+
+        self.image = self.frames[int(self.frame_index)]
+        self.drawn_image = self.image
+        self.rect = self.image.get_rect()
+        self.spawn((1500, 1700), (250, 600), 1500)
 
+    def spawn(
+            self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int],
+            speed: float
+        ) -> None:
+        """
+        Function which places the fireball at a random position off the screen
+        and sets how many pixels per second it moves left.
+        The exact position is kept in x, so slow speeds are not rounded away every tick.
+        """
+        self.speed = speed
+        self.frame_index = 0.0
+        self.animation_ticks = 0
         self.image = self.frames[int(self.frame_index)]
-        self.rect = self.image.get_rect(topleft = (randint(1500, 1700), randint(250, 600)))
+        self.drawn_image = self.image
+        self.rect.topleft = (randint(*rand_x_coord), randint(*rand_y_coord))
+        self.x = float(self.rect.x)
+        self.previous = self.rect.topleft
+
+    def recycle(self) -> None:
+        """Function which returns the fireball to its pool or removes it if it has none."""
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.kill()
 
     def disappear(self) -> None:
         """Functions which removes a fireball once it leaves the screen."""
         if self.rect.x <= -100:
-            self.kill()
+            self.recycle()
 
-    def animation(self) -> None:
-        """Function which animates the fireball by going trough the list of frames."""
+    def animation(self, interval: int = 1) -> None:
+        """
+        Function which animates the fireball by going trough the list of frames.
+        The image, and with it the mask collisions are checked with, changes every tick,
+        while the drawn image only catches up with it every interval ticks.
+        """
         self.frame_index += 0.05
         if self.frame_index >= len(self.frames):
             self.frame_index = 0
         self.image = self.frames[int(self.frame_index)]
 
-    def update(self) -> None:
-        """Function which updates the fireball for each frame of the game."""
-        self.rect.x -= 25
-        self.animation()
+        self.animation_ticks += 1
+        if self.animation_ticks >= interval:
+            self.animation_ticks = 0
+            self.drawn_image = self.image
+
+    def update(self, dt: float, animation_interval: int = 1) -> None:
+        """Function which updates the fireball for each simulation tick."""
+        self.previous = self.rect.topleft
+        self.x -= self.speed * dt
+        self.rect.x = int(self.x)
+        self.animation(animation_interval)
         self.disappear()
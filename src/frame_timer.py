@@ -0,0 +1,70 @@
+"""Module for timing the sections of a frame"""
+from collections import deque
+import time
+
+class Section():
+    """Class which adds the time spent inside a with block to a section of the current frame."""
+    def __init__(self, timer: "FrameTimer", name: str) -> None:
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self.timer.record(self.name, self.start, time.perf_counter() - self.start)
+
+
+class NoSection():
+    """Class which is used in place of Section when timing is turned off."""
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args) -> None:
+        pass
+
+
+class FrameTimer():
+    """
+    Class which measures how long each named section of a frame takes.
+    Every finished frame is stored as a dictionary of section name to seconds,
+    keeping only the last capacity frames if a capacity is given.
+    """
+    def __init__(self, enabled: bool = False, capacity: int | None = None) -> None:
+        self.enabled = enabled
+
+        self.sections: dict[str, Section] = {}
+        self.no_section = NoSection()
+
+        self.current: dict[str, float] = {}
+        self.frame_start = 0.0
+        self.frames: deque[dict[str, float]] = deque(maxlen = capacity)
+
+    def section(self, name: str) -> Section | NoSection:
+        """Function which returns the context manager that times the given section."""
+        if not self.enabled:
+            return self.no_section
+        if name not in self.sections:
+            self.sections[name] = Section(self, name)
+        return self.sections[name]
+
+    def record(self, name: str, start: float, elapsed: float) -> None:
+        """Function which adds the time spent in a section to the current frame."""
+        self.current[name] = self.current.get(name, 0.0) + elapsed
+
+    def begin_frame(self) -> None:
+        """Function which starts timing a new frame."""
+        if self.enabled:
+            self.current = {}
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """Function which finishes the current frame and stores its section times."""
+        if self.enabled:
+            self.current["total"] = time.perf_counter() - self.frame_start
+            self.frames.append(self.current)
+
+    def clear(self) -> None:
+        """Function which drops all stored frames."""
+        self.frames.clear()
@@ -1,268 +1,672 @@
 """Module for the game loop"""
-import math
+import gc
 import os
+import random
 import sys
+import time
+from functools import partial
 import pygame
-from .fireball import FireBall
+from .asset_loader import AssetLoader
+from .asset_registry import assets
+from .audio import AudioManager
+from .dirty_renderer import DirtyRenderer
 from .groups_and_collison import GroupsAndCollison
-from .orb import Orb
+from .input_state import InputRecorder, InputReplay, InputState, InputTracker
+from .profiler import FrameProfiler
+from .quality import QualityController
+from .scenes import SCENES, SceneStack
+from .score_store import ScoreStore
+from . import snapshot
+from .spawn_scheduler import SpawnScheduler, load_waves
+from .sprite_atlas import SHEETS
+from .text_cache import TextCache
+from .viewport import WORLD_HEIGHT, WORLD_WIDTH, Viewport
+
+# frame count, frame size and scale of every sprite sheet, by its path
+SHEET_SPECS = {path: spec for path, *spec in SHEETS}
+
+LATE_SOUNDS = {"transform_sound": "sounds/transformation.mp3",
+               "fireball_hit_sound": "sounds/fireball_hit.mp3",
+               "victory_sound": "sounds/victory.mp3"}
+
+# priority and the number of copies that may play at once for every sound effect
+SOUND_SETTINGS = {"attack_sound": (0, 2),
+                  "orb_break_sound": (1, 3),
+                  "fireball_hit_sound": (2, 2),
+                  "transform_sound": (3, 1),
+                  "victory_sound": (3, 1)}
 
 
 class GameLoop():
-    """Class which combines all game elements and starts the game."""
-    def __init__(self) -> None:
+    """
+    Class which combines all game elements and starts the game.
+    The game is simulated in fixed steps of tick_rate ticks per second,
+    with all speeds given in pixels per second, and drawn at up to max_fps.
+    In headless mode no window is shown, nothing waits on the clock
+    and the game only advances when step is called.
+    The game moves through the scenes in scenes.py, and only the assets of the first scene
+    are loaded before the first frame. The assets of the scenes that can follow the active one
+    are loaded on a background thread while it is played,
+    and the assets no scene in reach needs anymore are released.
+    Input is sampled once per frame, and the input of every tick can be recorded
+    to a file and replayed later together with the random seed.
+    Everything is positioned in world coordinates of 1280x720 and drawn
+    on a render surface of render_size, which is then scaled to the window.
+    With rewind_seconds the state of every tick is kept for that long,
+    so Backspace can jump a second back, and F5 and F9 save and load the state.
+    With manual_gc the garbage collector is frozen while a phase is played
+    and only runs when the phase changes, so it never pauses a frame mid-game.
+    Rewinding is off with manual_gc, because capturing and compressing the state
+    of every tick allocates far more per frame than the rest of the loop.
+    The drawing quality is set by quality_level, and with adaptive_quality it follows
+    the time frames take, except in headless, recorded and replayed games.
+    """
+    def __init__(
+            self, headless: bool = False, seed: int | None = None,
+            profile: bool = False, trace_path: str | None = None,
+            dirty_rects: bool = False, entity_store: bool = False,
+            max_fps: int = 60, waves_path: str = "waves.json",
+            scores_path: str | None = "scores.db",
+            record_path: str | None = None, replay_path: str | None = None,
+            render_size: tuple[int, int] = (WORLD_WIDTH, WORLD_HEIGHT),
+            window_size: tuple[int, int] = (WORLD_WIDTH, WORLD_HEIGHT),
+            integer_scaling: bool = False, rewind_seconds: float = 0,
+            quicksave_path: str = "quicksave.bin", manual_gc: bool = False,
+            quality_level: int = 0, adaptive_quality: bool = False
+        ) -> None:
+        self.startup_stats: dict[str, float | None] = {"started": time.perf_counter(),
+                                                       "first_frame": None,
+                                                       "all_loaded": None}
+        self.headless = headless
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+        self.replay = InputReplay(replay_path) if replay_path is not None else None
+        if self.replay is not None:
+            seed = self.replay.seed
+        elif record_path is not None and seed is None:
+            seed = random.randrange(2 ** 32)
+
+        if seed is not None:
+            random.seed(seed)
+
+        self.recorder = InputRecorder(record_path, seed) if record_path is not None else None
+        self.controls = InputState()
+        self.input_tracker = InputTracker()
+        self.frame_input = InputState()
+        # the input of the last tick is overwritten with the next one instead of building one
+        self.spare_input = InputState()
+        self.pending_clicks = 0
+
         pygame.init()
 
-        self.screen_width = 1280
-        self.screen_height = 720
+        self.screen_width = WORLD_WIDTH
+        self.screen_height = WORLD_HEIGHT
 
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+        self.render_size = render_size
+        self.view = Viewport(render_size, window_size, integer_scaling)
+        self.window = pygame.display.set_mode(window_size)
+        self.screen = self.view.create_screen(self.window)
         pygame.display.set_caption("Ascension")
 
+        self.dirty_rects = dirty_rects
+        self.renderer = DirtyRenderer(dirty_rects)
+        self.hud_rects = self.layout_hud()
+
         self.clock = pygame.time.Clock()
+        self.tick_rate = 60
+        self.dt = 1 / self.tick_rate
+        self.max_fps = max_fps
+        self.max_frame_time = 0.25
+        self.frame = 0
 
-        self.groups = GroupsAndCollison()
+        self.scroll_speeds = (600, 480)
+        self.bar_drain = 15
+        self.rewards = {"orb": 30,
+                        "fireball": -20}
 
-        self.bg_surface = pygame.image.load("gfx/backround.png").convert_alpha()
-        self.bg_width = self.bg_surface.get_width()
-        self.scroll = 0
-        self.tiles = math.ceil(self.screen_width / self.bg_width) + 1
+        # sheets found in the baked atlas are neither loaded nor sliced
+        if assets.atlas is None:
+            assets.load_atlas()
 
-        self.bg2_surface = pygame.image.load("gfx/backround2.png").convert_alpha()
-        self.bg2_width = self.bg2_surface.get_width()
-        self.scroll2 = 0
-        self.tiles2 = math.ceil(self.screen_width / self.bg2_width) + 1
+        self.loader: AssetLoader | None = None
+        # set when the assets of the following scenes wait for the running loader to finish
+        self.prefetch_pending = False
 
-        self.bar_length = 100.0
+        self.groups = GroupsAndCollison(entity_store = entity_store,
+                                        phase_one = False, phase_two = False)
+
+        self.text = TextCache()
 
-        self.sounds = {"attack_sound": pygame.mixer.Sound("sounds/attack.mp3"),
-                       "orb_break_sound": pygame.mixer.Sound("sounds/orb_break.mp3"),
-                       "music": pygame.mixer.Sound("sounds/music.mp3"),
-                       "transform_sound": pygame.mixer.Sound("sounds/transformation.mp3"),
-                       "fireball_hit_sound": pygame.mixer.Sound("sounds/fireball_hit.mp3"),
-                       "victory_sound": pygame.mixer.Sound("sounds/victory.mp3")}
+        self.frame_timer = FrameProfiler(profile)
+        self.trace_path = trace_path
 
-        self.orb_timer = pygame.USEREVENT + 1
-        pygame.time.set_timer(self.orb_timer, 1000)
+        self.scroll = 0.0
+        self.previous_scroll = 0.0
+        self.scroll2 = 0.0
+        self.previous_scroll2 = 0.0
 
-        self.fireball_timer = pygame.USEREVENT + 2
-        pygame.time.set_timer(self.fireball_timer, 1400)
+        self.bar_length = 100.0
+        self.shown_time = 0
+        self.time_label = "0"
+
+        self.audio = AudioManager()
+        self.audio.set_music("sounds/music.mp3")
+        self.add_sound("attack_sound", pygame.mixer.Sound("sounds/attack.mp3"))
+        self.add_sound("orb_break_sound", pygame.mixer.Sound("sounds/orb_break.mp3"))
 
-        self.phases = {"first_phase_active": True,
-                       "second_phase_active": False,
-                       "victory": False}
+        self.spawner = SpawnScheduler(load_waves(waves_path), self.tick_rate)
 
         self.start_time = 0
 
+        self.scores = ScoreStore(scores_path)
+
         self.final_time = 0
         self.best_time = 0
 
+        self.rewind = (snapshot.RewindBuffer(int(rewind_seconds * self.tick_rate))
+                       if rewind_seconds > 0 and not manual_gc else None)
+        self.quicksave_path = quicksave_path
 
-    def display_time(self, color: str) -> int:
-        """Function which tracks the elapsed time and displays it."""
-        current_time = (pygame.time.get_ticks() - self.start_time) // 1000
-        font = pygame.font.Font(None, 50)
+        self.manual_gc = manual_gc
+        self.gc_phase: str | None = None
+
+        self.scenes = SceneStack()
+        self.change_scene("first")
 
-        time_text_surf = font.render("Time", False, color)
-        time_text_rect = time_text_surf.get_rect(center = (150, 80))
+        self.quality = QualityController(1 / max_fps, quality_level)
+        self.adaptive_quality = adaptive_quality
+        self.apply_quality()
 
-        time_surf = font.render(f"{current_time}", False, color)
-        time_rect = time_surf.get_rect(center = (150, 120))
+    def change_scene(self, name: str) -> None:
+        """
+        Function which replaces the active scene with the named one.
+        The assets of every scene except the new one and the scenes that can follow it
+        are released, and the assets of the following scenes start loading in the background.
+        """
+        scene = SCENES[name]
+        keep = set(scene.asset_paths())
+        for following in scene.following:
+            keep.update(SCENES[following].asset_paths())
+        declared = {path for known in SCENES.values() for path in known.asset_paths()}
+        self.view.release(assets.release(declared - keep))
+
+        self.scenes.replace(scene(self))
+        self.renderer.invalidate()
+        self.prefetch()
+
+    def prefetch(self) -> None:
+        """
+        Function which starts loading the assets of the scenes that can follow the active one
+        on a background thread, together with the sound effects not loaded yet.
+        Sheets found in the baked atlas are neither loaded nor sliced.
+        If a loader is still running, only headless, recorded and replayed games wait for it,
+        other games start the new loader from tick once the running one is done.
+        """
+        if self.loader is not None and not self.loader.done() and not self.deterministic():
+            self.prefetch_pending = True
+            return
+        self.prefetch_pending = False
+        if self.loader is not None:
+            self.finish_loading()
+
+        paths = []
+        for following in self.scenes.top().following:
+            for path in SCENES[following].asset_paths():
+                if path not in paths and not assets.is_resident(path):
+                    paths.append(path)
+        sounds = {name: path for name, path in LATE_SOUNDS.items()
+                  if name not in self.audio.sounds}
+        if not paths and not sounds:
+            return
+
+        self.loader = AssetLoader(
+            {**{name: partial(pygame.mixer.Sound, path) for name, path in sounds.items()},
+             **{path: partial(pygame.image.load, path) for path in paths}})
+
+    def finish_loading(self) -> None:
+        """
+        Function which hands the assets loaded in the background to the game,
+        waiting for the loading thread if it is not done yet.
+        Sprite sheets are sliced into their frames right away.
+        """
+        if self.loader is None:
+            return
+
+        results = self.loader.take_results()
+        self.loader = None
+        for name, result in results.items():
+            if name in LATE_SOUNDS:
+                self.add_sound(name, result)
+                continue
+            assets.store_image(name, result)
+            if name in SHEET_SPECS:
+                assets.get_frames(name, *SHEET_SPECS[name])
+
+        if self.startup_stats["all_loaded"] is None:
+            self.startup_stats["all_loaded"] = (time.perf_counter()
+                                                - self.startup_stats["started"])
+
+    def loading_done(self) -> bool:
+        """Function which returns whether nothing is being loaded in the background."""
+        return self.loader is None or self.loader.done()
+
+    def deterministic(self) -> bool:
+        """
+        Function which returns whether the game has to play out the same for the same seed.
+        Headless, recorded and replayed runs pick loaded assets up at the scene change instead,
+        so seeded runs do not depend on how fast the loading thread was.
+        """
+        return self.headless or self.recorder is not None or self.replay is not None
+
+    def resident_asset_bytes(self) -> int:
+        """Function which returns the memory used by the assets kept right now, in bytes."""
+        return assets.resident_bytes() + self.view.image_bytes()
+
+    def add_sound(self, name: str, sound: pygame.mixer.Sound) -> None:
+        """Function which registers a sound effect with its settings from SOUND_SETTINGS."""
+        priority, max_voices = SOUND_SETTINGS[name]
+        self.audio.add_sound(name, sound, priority, max_voices)
+
+    def play_sound(self, name: str) -> None:
+        """Function which plays a sound effect if it has been loaded already."""
+        self.audio.play(name)
+
+    def start_music(self) -> None:
+        """Function which starts streaming the music."""
+        self.audio.play_music()
+
+    def stop_music(self) -> None:
+        """Function which stops the music."""
+        self.audio.stop_music()
+
+    def draw_text(
+            self, text: str, size: int, color: str, **position: tuple[int, int]
+        ) -> pygame.Rect:
+        """
+        Function which draws text anchored at a position in world coordinates,
+        for example center = (625, 300), and returns its rect on the render surface.
+        """
+        text_surf = self.text.render(text, self.view.size(size), color)
+        text_rect = text_surf.get_rect(**{anchor: self.view.point(point)
+                                          for anchor, point in position.items()})
+        self.screen.blit(text_surf, text_rect)
+        return text_rect
+
+    def layout_hud(self) -> dict[str, pygame.Rect]:
+        """
+        Function which builds the rects of the energy bar and the retry button once,
+        so drawing them every frame does not create new ones.
+        The retry button is kept both in world coordinates for the mouse
+        and in render coordinates for drawing.
+        """
+        return {"bar_fill": self.view.rect(pygame.Rect(400, 70, 100, 70)),
+                "bar_frame": self.view.rect(pygame.Rect(400, 70, 500, 70)),
+                "retry_button": pygame.Rect(475, 450, 300, 80),
+                "retry_button_view": self.view.rect(pygame.Rect(475, 450, 300, 80))}
+
+    def draw_loading_progress(self) -> None:
+        """Function which shows how much of the next scene has been loaded."""
+        if self.loader is None:
+            return
+        self.draw_text(f"Loading {int(self.loader.progress() * 100)}%", 30, "Black",
+                       bottomright = (1270, 710))
+
+    def set_render_scale(self, scale: float) -> None:
+        """
+        Function which draws the game at the given part of the chosen render size from now on.
+        The images scaled for the old size are dropped and scaled again when they are drawn.
+        """
+        size = (max(1, round(self.render_size[0] * scale)),
+                max(1, round(self.render_size[1] * scale)))
+        if size == self.view.render_size:
+            return
+
+        self.view = Viewport(size, self.view.window_size, self.view.integer_scaling)
+        self.screen = self.view.create_screen(self.window)
+        self.hud_rects = self.layout_hud()
+        self.renderer.invalidate()
+
+    def apply_quality(self) -> None:
+        """Function which switches the drawing to the settings of the current quality level."""
+        settings = self.quality.settings()
+        self.set_render_scale(settings["render_scale"])
+        self.groups.set_animation_interval(settings["animation_interval"])
+        self.renderer.enabled = self.dirty_rects or settings["dirty_rects"]
+        self.renderer.invalidate()
+
+    def get_ticks(self) -> int:
+        """Function which returns the simulated game time in milliseconds."""
+        return self.frame * 1000 // self.tick_rate
+
+    def elapsed_time(self) -> int:
+        """Function which returns the seconds passed since the current run started."""
+        return (self.get_ticks() - self.start_time) // 1000
 
-        self.screen.blit(time_text_surf, time_text_rect)
-        self.screen.blit(time_surf, time_rect)
+    def display_time(self, color: str) -> int:
+        """Function which tracks the elapsed time and displays it."""
+        current_time = self.elapsed_time()
+        if current_time != self.shown_time:
+            self.shown_time = current_time
+            self.time_label = str(current_time)
+        self.draw_text("Time", 50, color, center = (150, 80))
+        self.draw_text(self.time_label, 50, color, center = (150, 120))
 
         return current_time
 
     def draw_energy_bar(self, color: str) -> None:
         """Function which draws the energy bar on the screen for each frame of the game."""
-        font = pygame.font.Font(None, 50)
-        text_surface = font.render("Energy", False, color)
-        text_rect = text_surface.get_rect(center = (640, 50))
-        self.screen.blit(text_surface, text_rect)
+        self.draw_text("Energy", 50, color, center = (640, 50))
 
-        pygame.draw.rect(self.screen, "Yellow", pygame.Rect(400, 70, self.bar_length, 70))
-        pygame.draw.rect(self.screen, color, pygame.Rect(400, 70, 500, 70), 6)
+        bar_fill = self.hud_rects["bar_fill"]
+        bar_fill.width = max(0, round(int(self.bar_length) * self.view.scale))
+        pygame.draw.rect(self.screen, "Yellow", bar_fill)
+        pygame.draw.rect(self.screen, color, self.hud_rects["bar_frame"], self.view.size(6))
 
-    def bar_progress(self) -> None:
+    def bar_progress(self) -> str | None:
         """
-        Function which reduces the energy bar each frame,
-        checks the energy bar's state and changes game phases accordingly
-        and keeps track of the best time for completion of the game using a file.
+        Function which reduces the energy bar each simulation tick,
+        records every finished run in the score store
+        and returns the scene the run ends in, if it has ended.
         """
-        self.bar_length -= 0.25
+        self.bar_length -= self.bar_drain * self.dt
 
         if self.bar_length <= 0:
-            self.final_time = self.display_time("White")
-            self.phases["first_phase_active"] = False
-            self.phases["second_phase_active"] = False
-        elif self.bar_length >= 500:
+            self.final_time = self.elapsed_time()
+            self.scores.record(self.final_time, self.current_phase(), False)
+            return "game_over"
+        if self.bar_length >= 500:
             self.bar_length = 500
-            self.final_time = self.display_time("White")
-            with open("best_score.txt", "a+", encoding = "utf-8") as file:
-
-                if os.stat("best_score.txt").st_size == 0:
-                    file.write(f"{self.final_time}")
-                    self.best_time = self.final_time
-                else:
-                    file.seek(0)
-                    content = int(file.readline())
-
-                    if content < self.final_time:
-                        self.best_time = content
-                    else:
-                        file.truncate(0)
-                        file.write(f"{self.final_time}")
-                        self.best_time = self.final_time
-
-            self.phases["second_phase_active"] = False
-            self.phases["victory"] = True
+            self.final_time = self.elapsed_time()
+            self.scores.record(self.final_time, "victory", True)
+            self.best_time = self.scores.best_time()
+            return "victory"
+        return None
 
     def draw_victory_screen(self) -> None:
         """Function which draws the victory screen upon successful completion of the game."""
         self.screen.fill("Black")
-        victory_font = pygame.font.Font(None, 150)
-        victory_text_surf = victory_font.render("Congratulations!", False, "White")
-        victory_text_rect = victory_text_surf.get_rect(center = (625, 300))
-        self.screen.blit(victory_text_surf, victory_text_rect)
-
-        time_font = pygame.font.Font(None, 75)
-        best_text_surf = time_font.render(f"Best time: {self.best_time} seconds", False, "White")
-        best_text_rect = best_text_surf.get_rect(center = (625, 415))
-        fin_text_surf = time_font.render(f"Finish time: {self.final_time} seconds", False, "White")
-        fin_text_rect = fin_text_surf.get_rect(center = (625, 375))
-        self.screen.blit(fin_text_surf, fin_text_rect)
-        self.screen.blit(best_text_surf, best_text_rect)
+        self.draw_text("Congratulations!", 150, "White", center = (625, 300))
+        self.draw_text(f"Finish time: {self.final_time} seconds", 75, "White", center = (625, 375))
+        self.draw_text(f"Best time: {self.best_time} seconds", 75, "White", center = (625, 415))
+
+        self.draw_text("Top times", 40, "White", center = (625, 50))
+        for i, time_seconds in enumerate(self.scores.leaderboard):
+            self.draw_text(f"{i + 1}. {time_seconds} seconds", 36, "White",
+                           center = (625, 90 + i * 30))
 
     def draw_game_over(self) -> None:
         """Function which draws the game over screen upon the energy bar depleting completely"""
         self.screen.fill("Black")
-        game_over_font = pygame.font.Font(None, 150)
-        over_text_surf = game_over_font.render("Game Over", False, "White")
-        over_text_rect = over_text_surf.get_rect(center = (625, 300))
-        self.screen.blit(over_text_surf, over_text_rect)
-
-        time_font = pygame.font.Font(None, 75)
-        fin_text_surf = time_font.render(f"Finish time: {self.final_time} seconds", False, "White")
-        finish_text_rect = fin_text_surf.get_rect(center = (625, 375))
-        self.screen.blit(fin_text_surf, finish_text_rect)
-
-    def draw_retry_button(self) -> None:
-        """Function which draws the retry button on the victory/game over screen, 
-        which restarts the game upon being clicked"""
-        self.sounds["music"].stop()
-        pygame.draw.rect(self.screen, "White", pygame.Rect(475, 450, 300, 80), 6)
-
-        mouse_pos = pygame.mouse.get_pos()
-        if pygame.Rect(475, 450, 300, 80).collidepoint(mouse_pos):
-            if pygame.mouse.get_pressed()[0]:
-                self.start_time = pygame.time.get_ticks()
-                self.bar_length = 100
-                self.groups.orb_group.empty()
-                self.groups.fireball_group.empty()
-                self.groups.char1.reset()
-                self.groups.char2.reset()
-                self.sounds["music"].play(loops = -1)
-                self.phases["first_phase_active"] = True
-                self.phases["victory"] = False
-
-        retry_over_font = pygame.font.Font(None, 90)
-        retry_text_surf = retry_over_font.render("Retry", False, "White")
-        retry_text_rect = retry_text_surf.get_rect(center = (625, 490))
-        self.screen.blit(retry_text_surf, retry_text_rect)
-
-    def draw_phases(self) -> None:
-        """Function which draws the screen for each phase of the game"""
-        if self.phases["first_phase_active"]:
-            for i in range(0, self.tiles):
-                self.screen.blit(self.bg_surface, (i * self.bg_width + self.scroll, 0))
-
-            self.scroll -= 10
-
-            if abs(self.scroll) > self.bg_width:
-                self.scroll = 0
-
-            if self.bar_length >= 250:
-                self.sounds["transform_sound"].play()
-                self.groups.orb_group.empty()
-                self.phases["first_phase_active"] = False
-                self.phases["second_phase_active"] = True
-
-            self.bar_progress()
-            self.draw_energy_bar("Black")
-
-            self.groups.char1_group.draw(self.screen)
-            self.groups.char1_group.update()
-
-            self.groups.orb_group.draw(self.screen)
-            self.groups.orb_group.update(10)
-
-            self.display_time("Black")
-        elif self.phases["second_phase_active"]:
-            for i in range(0, self.tiles2):
-                self.screen.blit(self.bg2_surface, (i * self.bg2_width + self.scroll2, 0))
-
-            self.scroll2 -= 8
-
-            if abs(self.scroll2) > self.bg2_width:
-                self.scroll2 = 0
-
-            if self.bar_length >= 500:
-                self.sounds["music"].stop()
-                self.sounds["victory_sound"].play()
-
-            self.bar_progress()
-            self.draw_energy_bar("White")
-
-            self.groups.char2_group.draw(self.screen)
-            self.groups.char2_group.update()
-
-            self.groups.orb_group.draw(self.screen)
-            self.groups.orb_group.update(20)
-
-            self.groups.fireball_group.draw(self.screen)
-            self.groups.fireball_group.update()
-
-            if self.groups.collision_char2_orb():
-                self.sounds["orb_break_sound"].play()
-                self.bar_length += 30
-
-            if self.groups.collision_char2_fireball():
-                self.bar_length -= 20
-                self.sounds["fireball_hit_sound"].play()
-
-            self.display_time("White")
-        elif self.phases["victory"]:
-            self.draw_victory_screen()
-            self.draw_retry_button()
+        self.draw_text("Game Over", 150, "White", center = (625, 300))
+        self.draw_text(f"Finish time: {self.final_time} seconds", 75, "White", center = (625, 375))
+
+    def draw_retry_button(self, redraw: bool = True) -> None:
+        """Function which draws the retry button on the victory/game over screen"""
+        if redraw:
+            button_rect = self.hud_rects["retry_button_view"]
+            pygame.draw.rect(self.screen, "White", button_rect, self.view.size(6))
+
+            retry_text_rect = self.draw_text("Retry", 90, "White", center = (625, 490))
+            self.renderer.mark(self.view.to_window(button_rect.union(retry_text_rect)))
+
+    def retry_clicked(self) -> bool:
+        """Function which returns whether the retry button is held down in this tick."""
+        return (self.hud_rects["retry_button"].collidepoint(self.controls.mouse_pos)
+                and self.controls.mouse_held())
+
+    def restart(self) -> None:
+        """Function which starts a new run from the first scene."""
+        self.start_time = self.get_ticks()
+        self.bar_length = 100
+        self.groups.clear_orbs()
+        self.groups.clear_fireballs()
+        self.start_music()
+        self.change_scene("first")
+
+    def update_phases(self) -> None:
+        """Function which advances the active scene of the game by one simulation tick"""
+        self.scenes.top().update()
+
+    def draw_background(
+            self, surface: pygame.Surface, width: int, tiles: int,
+            previous_scroll: float, speed: float, alpha: float
+        ) -> None:
+        """
+        Function which draws a scrolling background between its last two positions,
+        so the scroll looks smooth at any frame rate.
+        """
+        scroll = -((speed * self.dt * alpha - previous_scroll) % width) * self.view.scale
+        image = self.view.image(surface)
+        for i in range(0, tiles):
+            self.screen.blit(image, (i * image.get_width() + scroll, 0))
+
+    def draw_phases(self, alpha: float = 1.0) -> None:
+        """
+        Function which draws the screen of the active scene.
+        Alpha is how far the game is between the last two simulation ticks
+        and is used to draw everything that moves in between them.
+        """
+        self.scenes.top().draw(alpha)
+
+    def current_phase(self) -> str:
+        """Function which returns the name of the active scene as used in the wave file."""
+        return self.scenes.top().name
+
+    def spawn_wave(self, wave: dict) -> None:
+        """Function which spawns the orbs or fireballs of a wave that is due."""
+        for _ in range(wave["count"]):
+            if wave["kind"] == "orb":
+                self.groups.spawn_orb(wave["x"], wave["y"], wave["speed"])
+            else:
+                self.groups.spawn_fireball(wave["x"], wave["y"], wave["speed"])
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """Function which reacts to a single event from the event queue."""
+        self.input_tracker.handle_event(event)
+        if event.type == pygame.QUIT:
+            self.quit()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.frame_timer.toggle()
+            self.renderer.invalidate()
+        self.scenes.top().handle_event(event)
+        # jumping around in time would make recorded and replayed input meaningless
+        if (event.type == pygame.KEYDOWN and self.recorder is None
+                and self.replay is None):
+            if event.key == pygame.K_BACKSPACE:
+                self.rewind_by(self.tick_rate)
+            elif event.key == pygame.K_F5:
+                self.save_state(self.quicksave_path)
+            elif event.key == pygame.K_F9 and os.path.exists(self.quicksave_path):
+                self.load_state(self.quicksave_path)
+
+    def handle_events(self) -> None:
+        """
+        Function which handles every event waiting in the event queue
+        and takes the input snapshot of this frame.
+        """
+        with self.frame_timer.section("events"):
+            for event in pygame.event.get():
+                self.handle_event(event)
+            # clicks of frames that ran no tick are kept until a tick uses them
+            controls = self.input_tracker.read(self.frame_input,
+                                               self.frame_input.clicks + self.pending_clicks)
+            controls.mouse_pos = self.view.to_world(controls.mouse_pos)
+            self.frame_input = controls
+            self.pending_clicks = 0
+
+    def next_input(self) -> InputState:
+        """
+        Function which returns the input of the next tick, taken from the replay if there is one.
+        When a frame runs several ticks, its clicks only count for the first of them.
+        """
+        if self.replay is not None:
+            controls = self.replay.next()
+            if controls is not None:
+                return controls
+            return self.controls.held()
+
+        controls = self.frame_input
+        self.frame_input = self.spare_input.assign(controls.buttons, controls.mouse_pos)
+        self.spare_input = controls
+        return controls
+
+    def attack(self) -> None:
+        """Function which lets the player character break an orb it touches on a click."""
+        self.play_sound("attack_sound")
+        if self.groups.collision_char1_orb():
+            self.play_sound("orb_break_sound")
+            self.bar_length += self.rewards["orb"]
+
+    def manage_gc(self) -> None:
+        """
+        Function which runs a full garbage collection whenever the phase has changed.
+        Everything that survives it is frozen and automatic collection is switched off
+        while a phase is played, and switched back on for the victory and game over screens.
+        """
+        phase = self.current_phase()
+        if not self.manual_gc or phase == self.gc_phase:
+            return
+        self.gc_phase = phase
+
+        gc.collect()
+        if phase in ("first", "second"):
+            gc.freeze()
+            gc.disable()
         else:
-            self.draw_game_over()
-            self.draw_retry_button()
+            gc.unfreeze()
+            gc.enable()
+
+    def tick(self) -> None:
+        """Function which advances the simulation by one fixed time step."""
+        self.manage_gc()
+        self.frame += 1
+        if not self.deterministic() and self.loader is not None and self.loader.done():
+            self.finish_loading()
+        if self.prefetch_pending and self.loader is None:
+            self.prefetch()
+
+        self.controls = self.next_input()
+        if self.recorder is not None:
+            self.recorder.add(self.controls)
+        self.scenes.top().handle_input(self.controls)
+
+        for wave in self.spawner.advance(self.current_phase()):
+            self.spawn_wave(wave)
+
+        self.update_phases()
+        self.manage_gc()
+
+        if self.rewind is not None:
+            with self.frame_timer.section("snapshot"):
+                self.rewind.push(snapshot.capture(self))
+
+    def save_state(self, path: str) -> None:
+        """Function which writes the current state of the simulation to a file."""
+        snapshot.save(self, path)
+
+    def load_state(self, path: str) -> None:
+        """
+        Function which continues the game from a state saved with save_state.
+        The states kept for rewinding belong to another timeline and are dropped.
+        """
+        snapshot.load(self, path)
+        if self.rewind is not None:
+            self.rewind.clear()
+        self.renderer.invalidate()
+
+    def rewind_by(self, ticks: int) -> None:
+        """Function which moves the game back by up to the given number of ticks."""
+        if self.rewind is None:
+            return
+        state = self.rewind.rewind(ticks)
+        if state is not None:
+            snapshot.restore(self, state)
+            self.renderer.invalidate()
+
+    def render(self, alpha: float) -> None:
+        """
+        Function which draws the current state and, unless headless, scales it to the window
+        and shows it on the display. The profiler overlay is drawn on the window itself.
+        """
+        self.draw_phases(alpha)
+
+        if not self.headless:
+            if self.renderer.pending():
+                with self.frame_timer.section("scale"):
+                    self.view.present(self.screen, self.window)
+            if self.frame_timer.enabled:
+                with self.frame_timer.section("overlay"):
+                    self.frame_timer.draw_overlay(self.window, self.text,
+                                                  f"quality {self.quality.level}")
+                    self.renderer.mark(self.frame_timer.overlay_rect)
+            with self.frame_timer.section("display_update"):
+                self.renderer.flush()
+
+        if self.startup_stats["first_frame"] is None:
+            self.startup_stats["first_frame"] = (time.perf_counter()
+                                                 - self.startup_stats["started"])
+
+    def step(self, frames: int = 1) -> None:
+        """
+        Function which advances the game by the given number of simulation ticks,
+        drawing once after every tick but never waiting on the clock.
+        """
+        for _ in range(frames):
+            self.frame_timer.begin_frame()
+            self.handle_events()
+            self.tick()
+            self.render(1.0)
+            self.frame_timer.end_frame()
+
+    def quit(self) -> None:
+        """
+        Function which writes the profiler trace and the input recording
+        if they were requested and closes the game.
+        """
+        if self.trace_path is not None and self.frame_timer.events:
+            self.frame_timer.export_trace(self.trace_path)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.manual_gc:
+            gc.unfreeze()
+            gc.enable()
+        self.scores.close()
+        pygame.quit()
+        sys.exit()
 
     def run(self) -> None:
-        """Function which starts the game loop and checks for events"""
-        self.sounds["music"].play(loops = -1)
+        """
+        Function which starts the game loop and checks for events.
+        Real time is collected in an accumulator and the simulation advances
+        in fixed steps, while frames are drawn as often as the frame rate limit allows.
+        A replayed game closes once its last recorded tick has run.
+        """
+        self.start_music()
 
+        accumulator = 0.0
+        previous_time = time.perf_counter()
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if self.phases["first_phase_active"]:
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        self.sounds["attack_sound"].play()
-                        if self.groups.collision_char1_orb():
-                            self.sounds["orb_break_sound"].play()
-                            self.bar_length += 30
-                    if event.type == self.orb_timer:
-                        self.groups.orb_group.add(Orb((1300, 1500), (250, 475)))
-                if self.phases["second_phase_active"]:
-                    if event.type == self.orb_timer:
-                        self.groups.orb_group.add(Orb((1500, 1700), (200, 600)))
-                    if event.type == self.fireball_timer:
-                        self.groups.fireball_group.add(FireBall())
-
-            self.draw_phases()
-
-            pygame.display.update()
-            self.clock.tick(60)
+            self.frame_timer.begin_frame()
+
+            current_time = time.perf_counter()
+            accumulator += min(current_time - previous_time, self.max_frame_time)
+            previous_time = current_time
+
+            self.handle_events()
+            while accumulator >= self.dt:
+                self.tick()
+                accumulator -= self.dt
+            if self.replay is not None and self.replay.done():
+                self.quit()
+
+            self.render(accumulator / self.dt)
+            self.frame_timer.end_frame()
+
+            # only the work of the frame counts, not the time spent waiting for the next one
+            if (self.adaptive_quality and not self.deterministic()
+                    and self.quality.add_frame(time.perf_counter() - current_time)):
+                self.apply_quality()
+
+            self.clock.tick(self.max_fps)
@@ -1,37 +1,340 @@
 """Module for sprite groups and collisons"""
 import pygame
+from .asset_registry import assets
 from .character_one import CharacterOne
 from .character_two import CharacterTwo
+from .entity_store import EntityStore
+from .fireball import FireBall
+from .helper_funcs import draw_interpolated
+from .orb import Orb
+from .spatial_hash import SpatialGroup
+from .sprite_pool import SpritePool
+from .viewport import Viewport
 
 class GroupsAndCollison():
-    """Class for sprite groups and collisions between them."""
-    def __init__(self) -> None:
-        self.char1 = CharacterOne()
+    """
+    Class for sprite groups and collisions between them.
+    Orbs and fireballs are kept in spatial hashes so a collision check
+    only looks at the hazards near the player character.
+    With the entity store turned on, orbs and fireballs are kept in NumPy arrays
+    instead of sprite groups and collide using their rects only.
+    The running character is only built by load_phase_one and the flying character
+    and the fireballs by load_phase_two, so the game can start before the sprite sheets
+    of the second phase are loaded, and each phase can drop the sprites of the other one.
+    """
+    def __init__(
+            self, pool_capacity: int = 16, cell_size: int = 128,
+            pixel_perfect: bool = True, entity_store: bool = False,
+            phase_one: bool = True, phase_two: bool = True
+        ) -> None:
+        self.pool_capacity = pool_capacity
+        self.pixel_perfect = pixel_perfect
+        self.entity_store = entity_store
+        self.animation_interval = 1
+
+        self.char1: CharacterOne | None = None
         self.char1_group: pygame.sprite.GroupSingle = pygame.sprite.GroupSingle()
+
+        self.char2: CharacterTwo | None = None
+        self.char2_group: pygame.sprite.GroupSingle = pygame.sprite.GroupSingle()
+
+        self.orb_group = SpatialGroup(cell_size)
+        self.orb_pool = SpritePool(lambda: Orb((0, 0), (0, 0)), pool_capacity)
+
+        self.fireball_group = SpatialGroup(cell_size)
+        self.fireball_pool: SpritePool | None = None
+
+        # reused by every collision check instead of building a new list each tick
+        self.collided: list[pygame.sprite.Sprite] = []
+
+        self.orb_store: EntityStore | None = None
+        self.fireball_store: EntityStore | None = None
+        if entity_store:
+            self.orb_store = EntityStore([assets.get_image("gfx/orb.png")])
+
+        if phase_one:
+            self.load_phase_one()
+        if phase_two:
+            self.load_phase_two()
+
+    def phase_one_loaded(self) -> bool:
+        """Function which returns whether the running character is built."""
+        return self.char1 is not None
+
+    def load_phase_one(self) -> None:
+        """Function which builds the running character if it is not built yet."""
+        if self.phase_one_loaded():
+            return
+
+        self.char1 = CharacterOne()
         self.char1_group.add(self.char1)
 
+    def unload_phase_one(self) -> None:
+        """Function which drops the running character, so its frames can be released."""
+        self.char1_group.empty()
+        self.char1 = None
+
+    def phase_two_loaded(self) -> bool:
+        """Function which returns whether the flying character and the fireballs are built."""
+        return self.char2 is not None
+
+    def load_phase_two(self) -> None:
+        """
+        Function which builds the flying character, the fireball pool and their masks.
+        Their sheets are taken from the asset registry, so if they were loaded
+        in the background beforehand this does not touch the disk.
+        """
+        if self.phase_two_loaded():
+            return
+
         self.char2 = CharacterTwo()
-        self.char2_group: pygame.sprite.GroupSingle = pygame.sprite.GroupSingle()
         self.char2_group.add(self.char2)
 
-        self.orb_group: pygame.sprite.Group = pygame.sprite.Group()
+        self.fireball_pool = SpritePool(FireBall, self.pool_capacity)
+        if self.entity_store:
+            self.fireball_store = EntityStore(
+                assets.get_frames("gfx/fireball.png", 8, (63, 43), 4), animation_speed = 0.05)
+            self.fireball_store.animation_interval = self.animation_interval
 
-        self.fireball_group: pygame.sprite.Group = pygame.sprite.Group()
+        self.precompute_masks()
 
-    def collision_char1_orb(self) -> list[pygame.sprite.Sprite]:
+    def unload_phase_two(self) -> None:
+        """
+        Function which drops the flying character, the fireballs and their pool,
+        so their frames can be released.
+        """
+        self.clear_fireballs()
+        self.char2_group.empty()
+        self.char2 = None
+        self.fireball_pool = None
+        self.fireball_store = None
+
+    def precompute_masks(self) -> None:
+        """
+        Function which builds the masks for every animation frame of the flying character,
+        the orbs and the fireballs once, so collisions never build them mid-game.
+        """
+        surfaces = [assets.get_image("gfx/orb.png")]
+        for frames in self.char2.frames.values():
+            surfaces.extend(frames)
+        for frames in assets.frames.values():
+            surfaces.extend(frames)
+
+        for surface in surfaces:
+            assets.get_mask(surface)
+
+    def spawn_orb(
+            self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int],
+            speed: float
+        ) -> None:
+        """Function which takes an orb from the pool, places it and adds it to the orb group."""
+        if self.orb_store is not None:
+            self.orb_store.spawn_random(rand_x_coord, rand_y_coord, speed)
+            return
+
+        orb = self.orb_pool.acquire()
+        orb.spawn(rand_x_coord, rand_y_coord, speed)
+        self.orb_group.add(orb)
+
+    def spawn_fireball(
+            self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int],
+            speed: float
+        ) -> None:
+        """Function which takes a fireball from the pool, places it and adds it to its group."""
+        if self.fireball_store is not None:
+            self.fireball_store.spawn_random(rand_x_coord, rand_y_coord, speed)
+            return
+
+        fireball = self.fireball_pool.acquire()
+        fireball.spawn(rand_x_coord, rand_y_coord, speed)
+        self.fireball_group.add(fireball)
+
+    def update_orbs(self, dt: float) -> None:
+        """Function which moves all orbs left by their own speed."""
+        if self.orb_store is not None:
+            self.orb_store.update(dt)
+        else:
+            self.orb_group.update(dt)
+
+    def set_animation_interval(self, interval: int) -> None:
+        """Function which lets the fireballs change their drawn frame every interval ticks."""
+        self.animation_interval = interval
+        if self.fireball_store is not None:
+            self.fireball_store.animation_interval = interval
+
+    def update_fireballs(self, dt: float) -> None:
+        """Function which moves and animates all fireballs."""
+        if self.fireball_store is not None:
+            self.fireball_store.update(dt)
+        else:
+            self.fireball_group.update(dt, self.animation_interval)
+
+    def draw_orbs(
+            self, surface: pygame.Surface, alpha: float = 1.0,
+            view: Viewport | None = None
+        ) -> None:
+        """Function which draws all orbs between their last two positions."""
+        if self.orb_store is not None:
+            self.orb_store.draw(surface, alpha, view)
+        else:
+            draw_interpolated(self.orb_group, surface, alpha, view)
+
+    def draw_fireballs(
+            self, surface: pygame.Surface, alpha: float = 1.0,
+            view: Viewport | None = None
+        ) -> None:
+        """Function which draws all fireballs between their last two positions."""
+        if self.fireball_store is not None:
+            self.fireball_store.draw(surface, alpha, view)
+        else:
+            draw_interpolated(self.fireball_group, surface, alpha, view)
+
+    def count_orbs(self) -> int:
+        """Function which returns the number of orbs in play."""
+        if self.orb_store is not None:
+            return len(self.orb_store)
+        return len(self.orb_group)
+
+    def count_fireballs(self) -> int:
+        """Function which returns the number of fireballs in play."""
+        if self.fireball_store is not None:
+            return len(self.fireball_store)
+        return len(self.fireball_group)
+
+    def orb_rects(self) -> list[pygame.Rect]:
+        """Function which returns the rects of the orbs in play."""
+        if self.orb_store is not None:
+            return self.orb_store.rects()
+        return [orb.rect for orb in self.orb_group]
+
+    def fireball_rects(self) -> list[pygame.Rect]:
+        """Function which returns the rects of the fireballs in play."""
+        if self.fireball_store is not None:
+            return self.fireball_store.rects()
+        return [fireball.rect for fireball in self.fireball_group]
+
+    def clear_orbs(self) -> None:
+        """Function which returns all active orbs to the pool."""
+        if self.orb_store is not None:
+            self.orb_store.clear()
+        self.orb_pool.release_all(self.orb_group)
+
+    def clear_fireballs(self) -> None:
+        """Function which returns all active fireballs to the pool."""
+        if self.fireball_store is not None:
+            self.fireball_store.clear()
+        if self.fireball_pool is not None:
+            self.fireball_pool.release_all(self.fireball_group)
+
+    def get_state(self) -> tuple[list[tuple], list[tuple]]:
+        """
+        Function which returns the orbs and fireballs in play, each as its position,
+        its previous position, its speed and its animation frame.
+        """
+        states = []
+        for store, group in ((self.orb_store, self.orb_group),
+                             (self.fireball_store, self.fireball_group)):
+            if store is not None:
+                alive = store.alive
+                # entities only move left, so their y never changes
+                # and is saved as the previous y as well
+                states.append(list(zip(store.x[alive].tolist(), store.y[alive].tolist(),
+                                       store.previous_x[alive].tolist(), store.y[alive].tolist(),
+                                       store.velocity[alive].tolist(),
+                                       store.frame_index[alive].tolist())))
+            else:
+                states.append([(sprite.x, sprite.rect.y, *sprite.previous, sprite.speed,
+                                getattr(sprite, "frame_index", 0.0)) for sprite in group])
+        return states[0], states[1]
+
+    def set_state(self, orbs: list[tuple], fireballs: list[tuple]) -> None:
+        """Function which replaces the orbs and fireballs in play with the ones from get_state."""
+        self.clear_orbs()
+        self.clear_fireballs()
+        for states, store, pool, group in ((orbs, self.orb_store, self.orb_pool, self.orb_group),
+                                           (fireballs, self.fireball_store, self.fireball_pool,
+                                            self.fireball_group)):
+            for x, y, previous_x, previous_y, speed, frame_index in states:
+                if store is not None:
+                    index = store.spawn(x, y, speed)
+                    store.previous_x[index] = previous_x
+                    store.frame_index[index] = frame_index
+                    store.drawn_frame[index] = frame_index
+                    continue
+
+                sprite = pool.acquire()
+                sprite.speed = speed
+                sprite.x = x
+                sprite.rect.topleft = (int(x), int(y))
+                sprite.previous = (int(previous_x), int(previous_y))
+                if hasattr(sprite, "frame_index"):
+                    sprite.frame_index = frame_index
+                    sprite.image = sprite.frames[int(frame_index)]
+                    sprite.drawn_image = sprite.image
+                group.add(sprite)
+
+    def pool_stats(self) -> dict[str, dict[str, int]]:
+        """Function which returns the hit, miss and overflow counters of both pools."""
+        stats = {"orbs": dict(self.orb_pool.stats, free = len(self.orb_pool.free))}
+        if self.fireball_pool is not None:
+            stats["fireballs"] = dict(self.fireball_pool.stats, free = len(self.fireball_pool.free))
+        return stats
+
+    def collide(
+            self, sprite: pygame.sprite.Sprite, group: SpatialGroup,
+            pixel_perfect: bool
+        ) -> list[pygame.sprite.Sprite]:
+        """
+        Function which returns the sprites of a group that touch the given sprite.
+        Only sprites in nearby cells of the spatial hash are tested with rects
+        and, if pixel perfect collision is on, with the masks of their current frames.
+        The returned list is reused by the next check.
+        """
+        collided = self.collided
+        collided.clear()
+        for other in group.nearby(sprite.rect):
+            if not sprite.rect.colliderect(other.rect):
+                continue
+            if pixel_perfect:
+                offset = (other.rect.x - sprite.rect.x, other.rect.y - sprite.rect.y)
+                if not assets.get_mask(sprite.image).overlap(assets.get_mask(other.image), offset):
+                    continue
+            collided.append(other)
+        return collided
+
+    def collision_char1_orb(self) -> list:
         """
         Function to check for collisions between player character and orbs in the first phase.
+        The attack reaches the whole character rect, so no masks are used here.
         """
-        return pygame.sprite.spritecollide(self.char1_group.sprite, self.orb_group, True)
+        if self.orb_store is not None:
+            return self.orb_store.collide(self.char1_group.sprite.rect)
 
-    def collision_char2_orb(self) -> list[pygame.sprite.Sprite]:
+        collided = self.collide(self.char1_group.sprite, self.orb_group, False)
+        for orb in collided:
+            self.orb_pool.release(orb)
+        return collided
+
+    def collision_char2_orb(self) -> list:
         """
         Function to check for collisions between player character and orbs in the second phase.
         """
-        return pygame.sprite.spritecollide(self.char2_group.sprite, self.orb_group, True)
+        if self.orb_store is not None:
+            return self.orb_store.collide(self.char2_group.sprite.rect)
+
+        collided = self.collide(self.char2_group.sprite, self.orb_group, self.pixel_perfect)
+        for orb in collided:
+            self.orb_pool.release(orb)
+        return collided
 
-    def collision_char2_fireball(self) -> list[pygame.sprite.Sprite]:
+    def collision_char2_fireball(self) -> list:
         """
         Function to check for collisions between player character and fireballs in the second phase.
         """
-        return pygame.sprite.spritecollide(self.char2_group.sprite, self.fireball_group, True)
+        if self.fireball_store is not None:
+            return self.fireball_store.collide(self.char2_group.sprite.rect)
+
+        collided = self.collide(self.char2_group.sprite, self.fireball_group, self.pixel_perfect)
+        for fireball in collided:
+            self.fireball_pool.release(fireball)
+        return collided
@@ -1,5 +1,6 @@
 """Module containing helper functions"""
 import pygame
+from .viewport import Viewport
 
 def get_frame(
         sheet: pygame.Surface, frame_count: int,
@@ -16,3 +17,36 @@ def get_frame(
     frame.set_colorkey("Black")
 
     return frame
+
+def image_number(frames: dict[str, list[pygame.Surface]], image: pygame.Surface) -> tuple[int, int]:
+    """
+    Function to find an image in a dictionary of frame lists.
+    It returns the position of its list and its position in that list.
+    """
+    for list_number, frame_list in enumerate(frames.values()):
+        if image in frame_list:
+            return list_number, frame_list.index(image)
+    return 0, 0
+
+def draw_interpolated(
+        sprites: pygame.sprite.AbstractGroup, surface: pygame.Surface, alpha: float,
+        view: Viewport | None = None
+    ) -> None:
+    """
+    Function to draw sprites between their previous and current positions.
+    Alpha is how far the game is between the last two simulation ticks,
+    so 0 draws the previous position and 1 the current one.
+    With a viewport the sprites are drawn scaled to its render resolution.
+    Sprites with a drawn_image are drawn with it instead of their image.
+    """
+    blit_list = []
+    scale = view.scale if view is not None else 1
+    for sprite in sprites:
+        previous_x, previous_y = sprite.previous
+        image = getattr(sprite, "drawn_image", sprite.image)
+        if view is not None:
+            image = view.image(image)
+        blit_list.append((image,
+                          ((previous_x + (sprite.rect.x - previous_x) * alpha) * scale,
+                           (previous_y + (sprite.rect.y - previous_y) * alpha) * scale)))
+    surface.blits(blit_list, False)
@@ -0,0 +1,162 @@
+"""Module for sampling, recording and replaying player input"""
+import struct
+import pygame
+
+# bit of every tracked key in InputState.buttons
+KEY_BITS = {pygame.K_SPACE: 0,
+            pygame.K_a: 1,
+            pygame.K_d: 2,
+            pygame.K_w: 3,
+            pygame.K_s: 4}
+MOUSE_BIT = 5
+ANY_KEY_BIT = 6
+
+REPLAY_MAGIC = b"ASCI"
+REPLAY_VERSION = 1
+HEADER = struct.Struct("<4sBI")
+# number of ticks, buttons, mouse x, mouse y, clicks
+RECORD = struct.Struct("<HBhhB")
+
+
+class InputState():
+    """
+    Class which holds the state of the controls for one simulation tick:
+    the tracked keys and the left mouse button as bits of buttons,
+    the mouse position and the number of mouse clicks since the last tick.
+    """
+    def __init__(
+            self, buttons: int = 0, mouse_pos: tuple[int, int] = (0, 0),
+            clicks: int = 0
+        ) -> None:
+        self.buttons = buttons
+        self.mouse_pos = mouse_pos
+        self.clicks = clicks
+
+    def pressed(self, key: int) -> bool:
+        """Function which returns whether a tracked key was held down."""
+        return bool(self.buttons >> KEY_BITS[key] & 1)
+
+    def mouse_held(self) -> bool:
+        """Function which returns whether the left mouse button was held down."""
+        return bool(self.buttons >> MOUSE_BIT & 1)
+
+    def any_key(self) -> bool:
+        """Function which returns whether any key of the keyboard was held down."""
+        return bool(self.buttons >> ANY_KEY_BIT & 1)
+
+    def held(self) -> "InputState":
+        """Function which returns the same state without the clicks, for the next tick."""
+        return InputState(self.buttons, self.mouse_pos)
+
+    def assign(
+            self, buttons: int, mouse_pos: tuple[int, int], clicks: int = 0
+        ) -> "InputState":
+        """Function which overwrites the state in place and returns it, so it can be reused."""
+        self.buttons = buttons
+        self.mouse_pos = mouse_pos
+        self.clicks = clicks
+        return self
+
+    def pack(self) -> tuple[int, int, int, int]:
+        """Function which returns the state as the fields of a replay record."""
+        return (self.buttons, self.mouse_pos[0], self.mouse_pos[1], min(self.clicks, 255))
+
+
+class InputTracker():
+    """
+    Class which follows the tracked keys, the number of held keys and the left mouse button
+    through the key and mouse events, so sampling the input once per frame
+    does not copy the state of every key of the keyboard.
+    """
+    def __init__(self) -> None:
+        self.buttons = 0
+        self.keys_held = 0
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """Function which updates the held keys and buttons from a single event."""
+        if event.type == pygame.KEYDOWN:
+            self.keys_held += 1
+            if event.key in KEY_BITS:
+                self.buttons |= 1 << KEY_BITS[event.key]
+        elif event.type == pygame.KEYUP:
+            self.keys_held = max(0, self.keys_held - 1)
+            if event.key in KEY_BITS:
+                self.buttons &= ~(1 << KEY_BITS[event.key])
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.buttons |= 1 << MOUSE_BIT
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.buttons &= ~(1 << MOUSE_BIT)
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # keys released in another window never send their key up event
+            self.buttons = 0
+            self.keys_held = 0
+
+    def read(self, state: InputState, clicks: int = 0) -> InputState:
+        """Function which writes the current input into the given state and returns it."""
+        buttons = self.buttons
+        if self.keys_held:
+            buttons |= 1 << ANY_KEY_BIT
+        return state.assign(buttons, pygame.mouse.get_pos(), clicks)
+
+
+class InputRecorder():
+    """
+    Class which records the input of every tick and saves it to a binary file.
+    Ticks with the same input are stored as a single record with a repeat count,
+    and the file is only written when the recording is closed.
+    """
+    def __init__(self, path: str, seed: int) -> None:
+        self.path = path
+        self.seed = seed
+        self.runs: list[list] = []
+
+    def add(self, state: InputState) -> None:
+        """Function which adds the input of one tick to the recording."""
+        fields = state.pack()
+        if self.runs and self.runs[-1][1] == fields and self.runs[-1][0] < 0xFFFF:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, fields])
+
+    def close(self) -> None:
+        """Function which writes the recording to its file."""
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed))
+            for count, fields in self.runs:
+                file.write(RECORD.pack(count, *fields))
+
+
+class InputReplay():
+    """Class which reads a recording and hands out the input of one tick at a time."""
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, self.seed = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a replay file of version {REPLAY_VERSION}")
+
+        self.runs = [(count, InputState(buttons, (mouse_x, mouse_y), clicks))
+                     for count, buttons, mouse_x, mouse_y, clicks
+                     in RECORD.iter_unpack(data[HEADER.size:])]
+        self.run_index = 0
+        self.repeat = 0
+
+    def next(self) -> InputState | None:
+        """Function which returns the input of the next tick, or None when the replay is over."""
+        if self.run_index >= len(self.runs):
+            return None
+
+        count, state = self.runs[self.run_index]
+        self.repeat += 1
+        if self.repeat >= count:
+            self.run_index += 1
+            self.repeat = 0
+        return state
+
+    def done(self) -> bool:
+        """Function which returns whether every recorded tick has been replayed."""
+        return self.run_index >= len(self.runs)
+
+    def __len__(self) -> int:
+        return sum(count for count, _ in self.runs)
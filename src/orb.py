@@ -1,23 +1,53 @@
 """Module for the orb object"""
 from random import randint
 import pygame
+from .asset_registry import assets
 
 class Orb(pygame.sprite.Sprite):
     """Class which represents the orbs in both phases."""
 
 
-    def __init__(self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int]) -> None:
+    def __init__(
+            self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int],
+            speed: float = 600
+        ) -> None:
         super().__init__()
 
-        self.image = pygame.image.load("gfx/orb.png").convert_alpha()
-        self.rect = self.image.get_rect(topleft = (randint(*rand_x_coord), randint(*rand_y_coord)))
+        self.pool = None
+
+        self.image = assets.get_image("gfx/orb.png")
+        self.rect = self.image.get_rect()
+        self.spawn(rand_x_coord, rand_y_coord, speed)
+
+    def spawn(
+            self, rand_x_coord: tuple[int, int], rand_y_coord: tuple[int, int],
+            speed: float
+        ) -> None:
+        """
+        Function which places the orb at a random position off the screen
+        and sets how many pixels per second it moves left.
+        The exact position is kept in x, so slow speeds are not rounded away every tick.
+        """
+        self.speed = speed
+        self.rect.topleft = (randint(*rand_x_coord), randint(*rand_y_coord))
+        self.x = float(self.rect.x)
+        self.previous = self.rect.topleft
+
+    def recycle(self) -> None:
+        """Function which returns the orb to its pool or removes it if it has none."""
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.kill()
 
     def disappear(self) -> None:
         """Functions which removes an orb once it leaves the screen."""
         if self.rect.x <= -100:
-            self.kill()
+            self.recycle()
 
-    def update(self, speed: int) -> None:
-        """Function which updates the orb location for each frame of the game."""
-        self.rect.x -= speed
+    def update(self, dt: float) -> None:
+        """Function which updates the orb location for each simulation tick."""
+        self.previous = self.rect.topleft
+        self.x -= self.speed * dt
+        self.rect.x = int(self.x)
         self.disappear()
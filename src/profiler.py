@@ -0,0 +1,102 @@
+"""Module for the in-game frame profiler"""
+from collections import deque
+import json
+import time
+import pygame
+from .frame_timer import FrameTimer
+from .text_cache import TextCache
+
+class FrameProfiler(FrameTimer):
+    """
+    Class which extends the frame timer with a ring buffer of section events,
+    a live frame time graph drawn over the game and an export to the Chrome trace format.
+    """
+    def __init__(self, enabled: bool = False, capacity: int = 600, budget: float = 1 / 60) -> None:
+        super().__init__(enabled, capacity)
+
+        self.budget = budget
+        self.origin = time.perf_counter()
+
+        self.current_events: list[tuple[str, float, float]] = []
+        self.events: deque[list[tuple[str, float, float]]] = deque(maxlen = capacity)
+
+        self.graph_size = (300, 120)
+        self.graph_position = (960, 10)
+        self.overlay_rect = pygame.Rect(self.graph_position,
+                                        (self.graph_size[0], self.graph_size[1] + 30))
+
+    def toggle(self) -> None:
+        """Function which turns the profiler and its overlay on or off."""
+        self.enabled = not self.enabled
+        self.current = {}
+        self.current_events = []
+        self.frame_start = time.perf_counter()
+
+    def record(self, name: str, start: float, elapsed: float) -> None:
+        """Function which adds the section time to the current frame and keeps it as an event."""
+        super().record(name, start, elapsed)
+        self.current_events.append((name, start, elapsed))
+
+    def begin_frame(self) -> None:
+        """Function which starts timing a new frame."""
+        super().begin_frame()
+        if self.enabled:
+            self.current_events = []
+
+    def end_frame(self) -> None:
+        """Function which finishes the current frame and stores its sections and events."""
+        if self.enabled:
+            super().end_frame()
+            self.current_events.append(("frame", self.frame_start, self.current["total"]))
+            self.events.append(self.current_events)
+
+    def over_budget(self) -> list[dict[str, float]]:
+        """Function which returns the stored frames that took longer than the frame budget."""
+        return [frame for frame in self.frames if frame["total"] > self.budget]
+
+    def draw_overlay(self, surface: pygame.Surface, text: TextCache, note: str = "") -> None:
+        """
+        Function which draws a graph of the recent frame times in the corner of the screen,
+        with a line marking the frame budget, the slowest section of the last frame
+        and an optional note after it.
+        """
+        if not self.enabled or not self.frames:
+            return
+
+        width, height = self.graph_size
+        left, top = self.graph_position
+        graph_rect = pygame.Rect(left, top, width, height)
+        pygame.draw.rect(surface, "Black", self.overlay_rect)
+
+        scale = height / (self.budget * 2)
+        frames = list(self.frames)[-width:]
+        for i, frame in enumerate(frames):
+            bar_height = min(height, int(frame["total"] * scale))
+            color = "Red" if frame["total"] > self.budget else "Green"
+            x = left + width - len(frames) + i
+            pygame.draw.line(surface, color, (x, top + height), (x, top + height - bar_height))
+
+        budget_y = top + height - int(self.budget * scale)
+        pygame.draw.line(surface, "Yellow", (left, budget_y), (left + width, budget_y))
+        pygame.draw.rect(surface, "White", graph_rect, 1)
+
+        last = frames[-1]
+        sections = [name for name in last if name != "total"]
+        slowest = max(sections, key = last.get) if sections else "total"
+        label = text.render(f"{last['total'] * 1000:.1f} ms  {slowest}  {note}", 24, "White")
+        surface.blit(label, (left + 4, top + height + 4))
+
+    def export_trace(self, path: str) -> None:
+        """Function which writes the stored events to a file readable by chrome://tracing."""
+        trace_events = []
+        for frame_events in self.events:
+            for name, start, elapsed in frame_events:
+                trace_events.append({"name": name,
+                                     "ph": "X",
+                                     "ts": (start - self.origin) * 1_000_000,
+                                     "dur": elapsed * 1_000_000,
+                                     "pid": 0,
+                                     "tid": 0})
+
+        with open(path, "w", encoding = "utf-8") as file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,92 @@
+"""Module for adapting the drawing quality to the time frames take"""
+from collections import deque
+
+# every level is cheaper to draw than the one before it:
+# render_scale is the part of the render size that is drawn before scaling to the window,
+# animation_interval how many ticks the drawn fireball frames wait between changes
+# and dirty_rects whether static screens only push their changed parts to the display
+QUALITY_LEVELS = ({"render_scale": 1.0, "animation_interval": 1, "dirty_rects": False},
+                  {"render_scale": 1.0, "animation_interval": 2, "dirty_rects": True},
+                  {"render_scale": 0.75, "animation_interval": 2, "dirty_rects": True},
+                  {"render_scale": 0.5, "animation_interval": 4, "dirty_rects": True})
+
+
+class QualityController():
+    """
+    Class which watches how long the recent frames took and steps the quality level
+    down when they go over the frame budget and back up when there is time to spare.
+    Level 0 is the full quality and every higher level in QUALITY_LEVELS is cheaper to draw.
+    To keep the level from flipping back and forth it only lowers the quality
+    when the average of a whole window of frames is over the budget,
+    only raises it after the average stayed well below the budget for raise_after frames,
+    starts a new window after every change, and waits twice as long before raising it again
+    each time a raised level had to be dropped before that wait was over.
+    """
+    def __init__(
+            self, budget: float = 1 / 60, level: int = 0, window: int = 60,
+            lower_above: float = 0.95, raise_below: float = 0.6,
+            raise_after: int = 180, max_raise_after: int = 3600
+        ) -> None:
+        self.budget = budget
+        self.level = max(0, min(level, len(QUALITY_LEVELS) - 1))
+        self.window = window
+        self.lower_above = lower_above
+        self.raise_below = raise_below
+        self.raise_after = raise_after
+        self.max_raise_after = max_raise_after
+
+        self.frame_times: deque[float] = deque(maxlen = window)
+        self.total = 0.0
+        self.calm_frames = 0
+        self.frames_since_raise: int | None = None
+
+        self.stats = {"lowered": 0,
+                      "raised": 0}
+
+    def settings(self) -> dict[str, float]:
+        """Function which returns the settings of the current quality level."""
+        return QUALITY_LEVELS[self.level]
+
+    def add_frame(self, seconds: float) -> bool:
+        """
+        Function which adds the time a frame took and returns whether the level changed.
+        Single slow frames, like the one that loads a scene, count as at most two budgets,
+        so they do not lower the quality on their own.
+        """
+        seconds = min(seconds, self.budget * 2)
+        if len(self.frame_times) == self.window:
+            self.total -= self.frame_times[0]
+        self.frame_times.append(seconds)
+        self.total += seconds
+        if self.frames_since_raise is not None:
+            self.frames_since_raise += 1
+
+        if len(self.frame_times) < self.window:
+            return False
+
+        average = self.total / self.window
+        if average > self.budget * self.lower_above and self.level < len(QUALITY_LEVELS) - 1:
+            if self.frames_since_raise is not None and self.frames_since_raise < self.raise_after:
+                self.raise_after = min(self.raise_after * 2, self.max_raise_after)
+            self.frames_since_raise = None
+            self.stats["lowered"] += 1
+            self.set_level(self.level + 1)
+            return True
+
+        if average < self.budget * self.raise_below and self.level > 0:
+            self.calm_frames += 1
+            if self.calm_frames >= self.raise_after:
+                self.frames_since_raise = 0
+                self.stats["raised"] += 1
+                self.set_level(self.level - 1)
+                return True
+        else:
+            self.calm_frames = 0
+        return False
+
+    def set_level(self, level: int) -> None:
+        """Function which switches to a quality level and starts measuring it from scratch."""
+        self.level = max(0, min(level, len(QUALITY_LEVELS) - 1))
+        self.frame_times.clear()
+        self.total = 0.0
+        self.calm_frames = 0
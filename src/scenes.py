@@ -0,0 +1,336 @@
+"""Module for the scenes the game moves through"""
+from typing import TYPE_CHECKING
+import pygame
+from .asset_registry import assets
+from .helper_funcs import draw_interpolated
+from .input_state import InputState
+
+if TYPE_CHECKING:
+    from .game_loop import GameLoop
+
+
+class Scene():
+    """
+    Class for one screen of the game, which advances the simulation in update,
+    draws itself in draw and reacts to events in handle_event.
+    Every scene declares the images and sprite sheets it needs and the scenes that can follow it,
+    so the game can load their assets in the background while it is played
+    and release the assets it used once it is over.
+    """
+    name = ""
+    images: tuple[str, ...] = ()
+    sheets: tuple[str, ...] = ()
+    following: tuple[str, ...] = ()
+
+    def __init__(self, game: "GameLoop") -> None:
+        self.game = game
+
+    @classmethod
+    def asset_paths(cls) -> tuple[str, ...]:
+        """Function which returns the paths of every image and sprite sheet the scene needs."""
+        return cls.images + cls.sheets
+
+    def enter(self) -> None:
+        """Function which runs when the scene becomes the active one."""
+
+    def exit(self) -> None:
+        """Function which runs when another scene replaces this one."""
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        """Function which reacts to a single event from the event queue."""
+
+    def handle_input(self, controls: InputState) -> None:
+        """Function which reacts to the input of a tick before the waves of the tick spawn."""
+
+    def update(self) -> None:
+        """Function which advances the scene by one simulation tick."""
+
+    def draw(self, alpha: float) -> None:
+        """
+        Function which draws the scene.
+        Alpha is how far the game is between the last two simulation ticks.
+        """
+
+
+class SceneStack():
+    """
+    Class which keeps the scenes of the game on a stack.
+    Only the scene on top is played and drawn, the ones below it wait until it is popped.
+    """
+    def __init__(self) -> None:
+        self.scenes: list[Scene] = []
+
+    def __len__(self) -> int:
+        return len(self.scenes)
+
+    def top(self) -> Scene:
+        """Function which returns the active scene."""
+        return self.scenes[-1]
+
+    def push(self, scene: Scene) -> None:
+        """Function which puts a scene on top of the active one."""
+        self.scenes.append(scene)
+        scene.enter()
+
+    def pop(self) -> Scene:
+        """Function which removes the active scene, so the one below it is active again."""
+        scene = self.scenes.pop()
+        scene.exit()
+        return scene
+
+    def replace(self, scene: Scene) -> Scene | None:
+        """Function which swaps the active scene for another one and returns the old one."""
+        previous = self.scenes.pop() if self.scenes else None
+        if previous is not None:
+            previous.exit()
+        self.scenes.append(scene)
+        scene.enter()
+        return previous
+
+
+class ScrollingScene(Scene):
+    """Class for a played phase with a background that scrolls at its own speed."""
+    background_path = ""
+
+    def __init__(self, game: "GameLoop") -> None:
+        super().__init__(game)
+        self.background: pygame.Surface | None = None
+        self.background_width = 0
+        self.tiles = 0
+
+    def enter(self) -> None:
+        self.background = assets.get_image(self.background_path)
+        self.background_width = self.background.get_width()
+        self.tiles = (self.game.screen_width + self.background_width - 1) \
+            // self.background_width + 1
+
+    def exit(self) -> None:
+        self.background = None
+
+
+class PhaseOneScene(ScrollingScene):
+    """
+    Class for the first phase, in which the running character attacks orbs
+    until the energy bar reaches 250.
+    """
+    name = "first"
+    images = ("gfx/backround.png", "gfx/orb.png")
+    sheets = ("gfx/char_phase_one/Run.png",
+              "gfx/char_phase_one/Jump.png",
+              "gfx/char_phase_one/Attack.png")
+    following = ("transformation", "game_over")
+    background_path = "gfx/backround.png"
+
+    def enter(self) -> None:
+        self.game.finish_loading()
+        super().enter()
+        self.game.groups.load_phase_one()
+
+    def exit(self) -> None:
+        super().exit()
+        self.game.groups.unload_phase_one()
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.game.pending_clicks += 1
+
+    def handle_input(self, controls: InputState) -> None:
+        for _ in range(controls.clicks):
+            self.game.attack()
+
+    def update(self) -> None:
+        game = self.game
+        timer = game.frame_timer
+        with timer.section("background"):
+            game.previous_scroll = game.scroll
+            game.scroll -= game.scroll_speeds[0] * game.dt
+
+            if abs(game.scroll) > self.background_width:
+                game.scroll = 0
+
+        transform = game.bar_length >= 250
+
+        with timer.section("bar_progress"):
+            outcome = game.bar_progress()
+
+        with timer.section("sprite_update"):
+            game.groups.char1_group.update(game.dt, game.controls)
+            game.groups.update_orbs(game.dt)
+
+        if outcome is not None:
+            game.change_scene(outcome)
+        elif transform:
+            game.change_scene("transformation")
+
+    def draw(self, alpha: float) -> None:
+        game = self.game
+        timer = game.frame_timer
+        game.renderer.begin_scrolling()
+        with timer.section("background"):
+            game.draw_background(self.background, self.background_width, self.tiles,
+                                 game.previous_scroll, game.scroll_speeds[0], alpha)
+
+        with timer.section("hud"):
+            game.draw_energy_bar("Black")
+
+        with timer.section("sprite_draw"):
+            draw_interpolated(game.groups.char1_group, game.screen, alpha, game.view)
+            game.groups.draw_orbs(game.screen, alpha, game.view)
+
+        with timer.section("hud"):
+            game.display_time("Black")
+            game.draw_loading_progress()
+
+
+class TransformationScene(Scene):
+    """
+    Class for the change from the first to the second phase.
+    It clears the orbs and hands over to the second phase as soon as its assets are loaded,
+    showing the loading progress in the meantime instead of stopping the game to wait.
+    Headless, recorded and replayed games wait for the assets right away,
+    so the scene never lasts a tick there.
+    """
+    name = "transformation"
+    images = ("gfx/backround2.png", "gfx/orb.png")
+    sheets = ("gfx/char_phase_two/fly_n.png",
+              "gfx/char_phase_two/fly_up.png",
+              "gfx/char_phase_two/fly_down.png",
+              "gfx/fireball.png")
+    following = ("second",)
+
+    def enter(self) -> None:
+        self.game.groups.clear_orbs()
+        self.update()
+
+    def update(self) -> None:
+        if self.game.deterministic() or self.game.loading_done():
+            self.game.finish_loading()
+            self.game.play_sound("transform_sound")
+            self.game.change_scene("second")
+
+    def draw(self, alpha: float) -> None:
+        game = self.game
+        with game.frame_timer.section("hud"):
+            game.renderer.begin_scrolling()
+            game.screen.fill("Black")
+            game.draw_text("Transforming", 100, "White", center = (640, 330))
+            game.draw_loading_progress()
+
+
+class PhaseTwoScene(ScrollingScene):
+    """
+    Class for the second phase, in which the flying character collects orbs
+    and dodges fireballs until the energy bar is full or empty.
+    """
+    name = "second"
+    images = TransformationScene.images
+    sheets = TransformationScene.sheets
+    following = ("victory", "game_over")
+    background_path = "gfx/backround2.png"
+
+    def enter(self) -> None:
+        self.game.finish_loading()
+        super().enter()
+        self.game.groups.load_phase_two()
+
+    def exit(self) -> None:
+        super().exit()
+        self.game.groups.unload_phase_two()
+
+    def update(self) -> None:
+        game = self.game
+        timer = game.frame_timer
+        with timer.section("background"):
+            game.previous_scroll2 = game.scroll2
+            game.scroll2 -= game.scroll_speeds[1] * game.dt
+
+            if abs(game.scroll2) > self.background_width:
+                game.scroll2 = 0
+
+        if game.bar_length >= 500:
+            game.stop_music()
+            game.play_sound("victory_sound")
+
+        with timer.section("bar_progress"):
+            outcome = game.bar_progress()
+
+        with timer.section("sprite_update"):
+            game.groups.char2_group.update(game.dt, game.controls)
+            game.groups.update_orbs(game.dt)
+            game.groups.update_fireballs(game.dt)
+
+        with timer.section("collision"):
+            if game.groups.collision_char2_orb():
+                game.play_sound("orb_break_sound")
+                game.bar_length += game.rewards["orb"]
+
+            if game.groups.collision_char2_fireball():
+                game.bar_length += game.rewards["fireball"]
+                game.play_sound("fireball_hit_sound")
+
+        if outcome is not None:
+            game.change_scene(outcome)
+
+    def draw(self, alpha: float) -> None:
+        game = self.game
+        timer = game.frame_timer
+        game.renderer.begin_scrolling()
+        with timer.section("background"):
+            game.draw_background(self.background, self.background_width, self.tiles,
+                                 game.previous_scroll2, game.scroll_speeds[1], alpha)
+
+        with timer.section("hud"):
+            game.draw_energy_bar("White")
+
+        with timer.section("sprite_draw"):
+            draw_interpolated(game.groups.char2_group, game.screen, alpha, game.view)
+            game.groups.draw_orbs(game.screen, alpha, game.view)
+            game.groups.draw_fireballs(game.screen, alpha, game.view)
+
+        with timer.section("hud"):
+            game.display_time("White")
+
+
+class EndScene(Scene):
+    """
+    Class for a screen shown after a run has ended, drawn only when it changes,
+    with a retry button that starts a new run.
+    """
+    following = ("first",)
+
+    def enter(self) -> None:
+        self.game.stop_music()
+
+    def update(self) -> None:
+        if self.game.retry_clicked():
+            self.game.restart()
+
+    def draw(self, alpha: float) -> None:
+        with self.game.frame_timer.section("hud"):
+            redraw = self.game.renderer.begin_static(self.name)
+            if redraw:
+                self.draw_screen()
+            self.game.draw_retry_button(redraw)
+
+    def draw_screen(self) -> None:
+        """Function which draws everything on the screen except the retry button."""
+
+
+class VictoryScene(EndScene):
+    """Class for the victory screen upon successful completion of the game."""
+    name = "victory"
+
+    def draw_screen(self) -> None:
+        self.game.draw_victory_screen()
+
+
+class GameOverScene(EndScene):
+    """Class for the game over screen upon the energy bar depleting completely."""
+    name = "game_over"
+
+    def draw_screen(self) -> None:
+        self.game.draw_game_over()
+
+
+SCENES: dict[str, type[Scene]] = {scene.name: scene for scene in (
+    PhaseOneScene, TransformationScene, PhaseTwoScene, VictoryScene, GameOverScene)}
@@ -0,0 +1,101 @@
+"""Module for saving the results of every run"""
+from bisect import insort
+from datetime import datetime
+import os
+import queue
+import sqlite3
+import threading
+
+class ScoreStore():
+    """
+    Class which keeps the history of all runs in an SQLite database.
+    Writes happen on a background thread, so the game never waits on the disk,
+    and the best times are also kept in memory for the victory screen.
+    """
+    def __init__(
+            self, path: str | None = "scores.db",
+            legacy_path: str = "best_score.txt", leaderboard_size: int = 5
+        ) -> None:
+        self.path = path if path is not None else ":memory:"
+        self.leaderboard_size = leaderboard_size
+
+        self.leaderboard: list[int] = []
+        self.queue: queue.Queue = queue.Queue()
+        self.loaded = threading.Event()
+
+        self.thread = threading.Thread(target = self.worker, args = (legacy_path,), daemon = True)
+        self.thread.start()
+        self.loaded.wait()
+
+    def connect(self) -> sqlite3.Connection:
+        """Function which opens the database and creates the table of runs if needed."""
+        connection = sqlite3.connect(self.path)
+        if self.path != ":memory:":
+            connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("""CREATE TABLE IF NOT EXISTS runs (
+                                  id INTEGER PRIMARY KEY,
+                                  time INTEGER NOT NULL,
+                                  phase TEXT NOT NULL,
+                                  won INTEGER NOT NULL,
+                                  date TEXT)""")
+        connection.execute("CREATE INDEX IF NOT EXISTS runs_won_time ON runs (won, time)")
+        connection.commit()
+        return connection
+
+    def import_legacy(self, connection: sqlite3.Connection, legacy_path: str) -> None:
+        """Function which copies the best time from the old best_score.txt into a new database."""
+        if not os.path.exists(legacy_path):
+            return
+        if connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]:
+            return
+
+        with open(legacy_path, encoding = "utf-8") as file:
+            content = file.readline().strip()
+        if content.isdigit():
+            with connection:
+                connection.execute("INSERT INTO runs (time, phase, won, date) "
+                                   "VALUES (?, 'victory', 1, NULL)", (int(content),))
+
+    def worker(self, legacy_path: str) -> None:
+        """
+        Function which runs on the background thread,
+        loads the leaderboard and then writes every queued run in its own transaction.
+        """
+        try:
+            connection = self.connect()
+            if self.path != ":memory:":
+                self.import_legacy(connection, legacy_path)
+            self.leaderboard = [time for (time,) in connection.execute(
+                "SELECT time FROM runs WHERE won = 1 ORDER BY time LIMIT ?",
+                (self.leaderboard_size,))]
+        finally:
+            self.loaded.set()
+
+        while True:
+            run = self.queue.get()
+            if run is None:
+                break
+            with connection:
+                connection.execute("INSERT INTO runs (time, phase, won, date) VALUES (?, ?, ?, ?)",
+                                   run)
+            self.queue.task_done()
+
+        connection.close()
+        self.queue.task_done()
+
+    def record(self, time: int, phase: str, won: bool) -> None:
+        """Function which queues a finished run to be saved and updates the leaderboard."""
+        self.queue.put((time, phase, int(won), datetime.now().isoformat(timespec = "seconds")))
+        if won:
+            insort(self.leaderboard, time)
+            del self.leaderboard[self.leaderboard_size:]
+
+    def best_time(self) -> int | None:
+        """Function which returns the best winning time, or None if the game was never won."""
+        return self.leaderboard[0] if self.leaderboard else None
+
+    def close(self) -> None:
+        """Function which waits for the queued runs to be written and stops the thread."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.queue.join()
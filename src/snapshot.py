@@ -0,0 +1,200 @@
+"""Module for capturing, restoring and rewinding the state of the simulation"""
+from collections import deque
+import math
+import random
+import struct
+import zlib
+
+SNAPSHOT_MAGIC = b"ASCS"
+SNAPSHOT_VERSION = 2
+SCENE_NAMES = (None, "first", "second", "victory", "game_over", "transformation")
+
+HEADER = struct.Struct("<4sB")
+# frame, start time, final time, best time, bar length, the four scroll offsets,
+# the active scene and whether the running and the flying character are built
+GAME = struct.Struct("<4i5db2?")
+# scene, tick and queue length of the spawn schedule
+SPAWNER = struct.Struct("<bii")
+WAVE = struct.Struct("<ii")
+RANDOM = struct.Struct("<i625Id")
+CHARACTER_ONE = struct.Struct("<4i4d?2B")
+CHARACTER_TWO = struct.Struct("<4i3d2B")
+COUNT = struct.Struct("<I")
+# position, previous position, speed and animation frame of an orb or fireball
+ENTITY = struct.Struct("<6d")
+
+
+def capture(game) -> bytes:
+    """Function which packs the whole simulation state of a game into bytes."""
+    groups = game.groups
+    parts = [HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION),
+             GAME.pack(game.frame, game.start_time, game.final_time,
+                       game.best_time if game.best_time is not None else -1,
+                       game.bar_length, game.scroll, game.previous_scroll,
+                       game.scroll2, game.previous_scroll2,
+                       SCENE_NAMES.index(game.current_phase()),
+                       groups.phase_one_loaded(), groups.phase_two_loaded())]
+
+    phase, tick, queue = game.spawner.get_state()
+    parts.append(SPAWNER.pack(SCENE_NAMES.index(phase), tick, len(queue)))
+    parts.extend(WAVE.pack(*wave) for wave in queue)
+
+    version, internal_state, gauss_next = random.getstate()
+    parts.append(RANDOM.pack(version, *internal_state,
+                             gauss_next if gauss_next is not None else math.nan))
+
+    if groups.char1 is not None:
+        parts.append(CHARACTER_ONE.pack(*groups.char1.get_state()))
+    if groups.char2 is not None:
+        parts.append(CHARACTER_TWO.pack(*groups.char2.get_state()))
+
+    for entities in groups.get_state():
+        parts.append(COUNT.pack(len(entities)))
+        parts.extend(ENTITY.pack(*entity) for entity in entities)
+
+    return b"".join(parts)
+
+
+def restore(game, data: bytes) -> None:
+    """Function which puts a game back in the state captured in the given bytes."""
+    magic, version = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Not a snapshot of version {SNAPSHOT_VERSION}")
+    offset = HEADER.size
+
+    (frame, start_time, final_time, best_time, bar_length,
+     scroll, previous_scroll, scroll2, previous_scroll2,
+     scene, phase_one_loaded, phase_two_loaded) = GAME.unpack_from(data, offset)
+    offset += GAME.size
+
+    phase, tick, queue_length = SPAWNER.unpack_from(data, offset)
+    offset += SPAWNER.size
+    queue = [WAVE.unpack_from(data, offset + i * WAVE.size) for i in range(queue_length)]
+    offset += queue_length * WAVE.size
+
+    random_state = RANDOM.unpack_from(data, offset)
+    offset += RANDOM.size
+
+    character_one = None
+    if phase_one_loaded:
+        character_one = CHARACTER_ONE.unpack_from(data, offset)
+        offset += CHARACTER_ONE.size
+    character_two = None
+    if phase_two_loaded:
+        character_two = CHARACTER_TWO.unpack_from(data, offset)
+        offset += CHARACTER_TWO.size
+
+    entities = []
+    for _ in range(2):
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        entities.append([ENTITY.unpack_from(data, offset + i * ENTITY.size)
+                         for i in range(count)])
+        offset += count * ENTITY.size
+
+    # the transformation only lasts until the second phase is loaded, so it goes straight there
+    name = SCENE_NAMES[scene] if SCENE_NAMES[scene] != "transformation" else "second"
+    if game.current_phase() != name:
+        game.change_scene(name)
+
+    game.frame = frame
+    game.start_time = start_time
+    game.final_time = final_time
+    game.best_time = best_time if best_time >= 0 else None
+    game.bar_length = bar_length
+    game.scroll, game.previous_scroll = scroll, previous_scroll
+    game.scroll2, game.previous_scroll2 = scroll2, previous_scroll2
+
+    game.spawner.set_state(SCENE_NAMES[phase], tick, queue)
+    gauss_next = None if math.isnan(random_state[-1]) else random_state[-1]
+    random.setstate((random_state[0], tuple(random_state[1:-1]), gauss_next))
+
+    if character_one is not None:
+        game.groups.char1.set_state(character_one)
+    if character_two is not None:
+        game.groups.char2.set_state(character_two)
+    game.groups.set_state(*entities)
+
+
+def save(game, path: str) -> None:
+    """Function which writes the compressed state of a game to a file."""
+    with open(path, "wb") as file:
+        file.write(zlib.compress(capture(game)))
+
+
+def load(game, path: str) -> None:
+    """Function which puts a game back in the state saved in a file."""
+    with open(path, "rb") as file:
+        restore(game, zlib.decompress(file.read()))
+
+
+def xor_delta(old: bytes, new: bytes) -> bytes:
+    """
+    Function which returns the length of new followed by the byte-wise xor of both states,
+    which is mostly zeros when little changed between them.
+    """
+    length = max(len(old), len(new))
+    delta = int.from_bytes(old, "little") ^ int.from_bytes(new, "little")
+    return COUNT.pack(len(new)) + delta.to_bytes(length, "little")
+
+
+def apply_delta(old: bytes, delta: bytes) -> bytes:
+    """Function which turns a state and the delta from xor_delta back into the new state."""
+    (length,) = COUNT.unpack_from(delta)
+    new = int.from_bytes(old, "little") ^ int.from_bytes(delta[COUNT.size:], "little")
+    return new.to_bytes(max(len(old), len(delta) - COUNT.size), "little")[:length]
+
+
+class RewindBuffer():
+    """
+    Class which keeps the states of the last capacity simulation ticks.
+    Only the oldest state is kept whole, every later one is stored as the compressed
+    difference to the state before it, and the oldest one is dropped once the buffer is full.
+    """
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.oldest: bytes | None = None
+        self.latest: bytes | None = None
+        self.deltas: deque[bytes] = deque()
+
+    def __len__(self) -> int:
+        return 0 if self.oldest is None else len(self.deltas) + 1
+
+    def push(self, state: bytes) -> None:
+        """Function which adds the state of the newest tick."""
+        if self.oldest is None:
+            self.oldest = self.latest = state
+            return
+
+        self.deltas.append(zlib.compress(xor_delta(self.latest, state), 1))
+        self.latest = state
+        if len(self.deltas) >= self.capacity:
+            self.oldest = apply_delta(self.oldest, zlib.decompress(self.deltas.popleft()))
+
+    def rewind(self, ticks: int) -> bytes | None:
+        """
+        Function which returns the state from the given number of ticks ago,
+        or the oldest one kept, and forgets every state after it.
+        """
+        if self.oldest is None:
+            return None
+
+        keep = max(0, len(self.deltas) - ticks)
+        state = self.oldest
+        for i in range(keep):
+            state = apply_delta(state, zlib.decompress(self.deltas[i]))
+        while len(self.deltas) > keep:
+            self.deltas.pop()
+        self.latest = state
+        return state
+
+    def clear(self) -> None:
+        """Function which forgets every kept state."""
+        self.oldest = self.latest = None
+        self.deltas.clear()
+
+    def size(self) -> int:
+        """Function which returns how many bytes the kept states take up."""
+        if self.oldest is None:
+            return 0
+        return len(self.oldest) + len(self.latest) + sum(len(delta) for delta in self.deltas)
@@ -0,0 +1,242 @@
+"""
+Module for soak testing the game over many runs in a row.
+
+Run it from the project folder with:
+    python -m src.soak_test --minutes 120 --log soak.csv
+The autopilot plays headless and presses retry after every finished run.
+Every sample interval it logs the memory, group sizes and frame times,
+and at the end it exits with an error if anything kept growing.
+"""
+import argparse
+import csv
+import gc
+import os
+import sys
+import time
+import pygame
+from .asset_registry import assets
+from .autopilot import Autopilot
+from .benchmark import percentile
+from .game_loop import GameLoop
+
+# how much the largest value of the last third of the samples may exceed
+# the largest value of the first third before it counts as drift
+DRIFT_LIMITS = {"rss_bytes": 0.10,
+                "asset_bytes": 0.10,
+                "cached_surfaces": 0.10,
+                "gc_objects": 0.10,
+                "spatial_cells": 0.25,
+                "peak_orbs": 0.50,
+                "peak_fireballs": 0.50,
+                "p95_frame_ms": 0.50}
+
+
+def resident_memory() -> int | None:
+    """
+    Function which returns the resident set size of the process in bytes,
+    or None on systems without /proc.
+    """
+    try:
+        with open("/proc/self/statm", encoding = "utf-8") as file:
+            pages = int(file.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def cached_surfaces(game: GameLoop) -> int:
+    """Function which returns how many images, frames, masks and texts are cached right now."""
+    return (len(assets.images) + sum(len(frames) for frames in assets.frames.values())
+            + len(assets.masks) + len(game.view.images) + len(game.text.surfaces))
+
+
+class SpriteAges():
+    """
+    Class which remembers the tick every sprite of a group was first seen in it
+    and reports the ones that stayed longer than they should.
+    Pooled sprites that leave the group and come back are counted from their return.
+    """
+    def __init__(self) -> None:
+        self.first_seen: dict[pygame.sprite.Sprite, int] = {}
+
+    def update(self, group: pygame.sprite.Group, tick: int) -> None:
+        """Function which notes the new sprites of a group and forgets the ones that left it."""
+        for sprite in group:
+            if sprite not in self.first_seen:
+                self.first_seen[sprite] = tick
+        if len(self.first_seen) > len(group):
+            self.first_seen = {sprite: first for sprite, first in self.first_seen.items()
+                               if sprite in group}
+
+    def stale(self, tick: int, max_age: int) -> int:
+        """Function which returns how many sprites have been in the group for max_age ticks."""
+        return sum(tick - first >= max_age for first in self.first_seen.values())
+
+
+def find_drift(
+        samples: list[dict], limits: dict[str, float] = DRIFT_LIMITS, warmup_runs: int = 2
+    ) -> list[str]:
+    """
+    Function which compares the first and the last third of the samples
+    and describes every value that grew by more than its limit.
+    Samples taken before warmup_runs runs were finished are left out,
+    because the memory and the caches still fill up during the first runs.
+    The largest value of each third is used, so values that depend on the phase
+    a sample was taken in do not look like drift.
+    """
+    samples = [sample for sample in samples if sample["runs"] >= warmup_runs]
+    third = len(samples) // 3
+    if third < 2:
+        return [f"only {len(samples)} samples were taken after the first {warmup_runs} runs, "
+                f"at least 6 are needed to look for drift"]
+
+    problems = []
+    for field, limit in limits.items():
+        early = [sample[field] for sample in samples[:third] if sample[field] is not None]
+        late = [sample[field] for sample in samples[-third:] if sample[field] is not None]
+        if not early or not late:
+            continue
+        before = max(early)
+        after = max(late)
+        if after > before * (1 + limit) and after - before > 1:
+            problems.append(f"{field} grew from {before:g} to {after:g}")
+    return problems
+
+
+def soak(
+        minutes: float, sample_seconds: float, seed: int, entity_store: bool = False,
+        max_sprite_age: float = 30, retry_after: float = 1, log_path: str | None = None,
+        warmup_runs: int = 2
+    ) -> tuple[list[dict], list[str]]:
+    """
+    Function which lets the autopilot play a headless game for the given minutes of game time,
+    retrying after every finished run, and returns the samples and the problems found.
+    Drift is only looked for in the samples taken after the first warmup_runs runs.
+    Orbs and fireballs that stay in their group for max_sprite_age seconds are reported,
+    which only works for sprites, not for the entity store.
+    """
+    game = GameLoop(headless = True, seed = seed, entity_store = entity_store,
+                    scores_path = None)
+    pilot = Autopilot(retry_after = int(retry_after * game.tick_rate))
+    total_ticks = int(minutes * 60 * game.tick_rate)
+    sample_ticks = int(sample_seconds * game.tick_rate)
+    max_age = int(max_sprite_age * game.tick_rate)
+    orb_ages = SpriteAges()
+    fireball_ages = SpriteAges()
+
+    log = None
+    writer = None
+    if log_path is not None:
+        log = open(log_path, "w", newline = "", encoding = "utf-8")
+
+    samples = []
+    problems = []
+    frame_times = []
+    runs = 0
+    peak_orbs = 0
+    peak_fireballs = 0
+    stale_sprites = 0
+    try:
+        while game.frame < total_ticks:
+            phase = game.current_phase()
+            start = time.perf_counter()
+            game.frame_input = pilot.controls(game)
+            game.tick()
+            game.render(1.0)
+            frame_times.append((time.perf_counter() - start) * 1000)
+
+            if phase in ("victory", "game_over") and game.current_phase() == "first":
+                runs += 1
+            peak_orbs = max(peak_orbs, game.groups.count_orbs())
+            peak_fireballs = max(peak_fireballs, game.groups.count_fireballs())
+            orb_ages.update(game.groups.orb_group, game.frame)
+            fireball_ages.update(game.groups.fireball_group, game.frame)
+
+            if game.frame % sample_ticks:
+                continue
+
+            stale = (orb_ages.stale(game.frame, max_age)
+                     + fireball_ages.stale(game.frame, max_age))
+            stale_sprites = max(stale_sprites, stale)
+            spatial = [group.spatial for group in (game.groups.orb_group,
+                                                   game.groups.fireball_group)]
+            sample = {"minutes": round(game.frame / game.tick_rate / 60, 2),
+                      "runs": runs,
+                      "phase": game.current_phase(),
+                      "rss_bytes": resident_memory(),
+                      "asset_bytes": game.resident_asset_bytes(),
+                      "cached_surfaces": cached_surfaces(game),
+                      "gc_objects": len(gc.get_objects()),
+                      "orbs": game.groups.count_orbs(),
+                      "fireballs": game.groups.count_fireballs(),
+                      "peak_orbs": peak_orbs,
+                      "peak_fireballs": peak_fireballs,
+                      "stale_sprites": stale,
+                      "spatial_cells": sum(len(grid.cells) for grid in spatial),
+                      "spatial_sprites": sum(len(grid.sprite_bounds) for grid in spatial),
+                      "p50_frame_ms": percentile(frame_times, 50),
+                      "p95_frame_ms": percentile(frame_times, 95),
+                      "p99_frame_ms": percentile(frame_times, 99),
+                      "max_frame_ms": max(frame_times)}
+            samples.append(sample)
+            frame_times = []
+            peak_orbs = 0
+            peak_fireballs = 0
+
+            print(f"{sample['minutes']:g} min, {runs} runs: "
+                  f"rss {(sample['rss_bytes'] or 0) / 2 ** 20:.1f} MiB, "
+                  f"assets {sample['asset_bytes'] / 2 ** 20:.1f} MiB, "
+                  f"{sample['orbs']} orbs, {sample['fireballs']} fireballs, "
+                  f"p95 {sample['p95_frame_ms']:.2f} ms")
+            if log is not None:
+                if writer is None:
+                    writer = csv.DictWriter(log, fieldnames = list(sample))
+                    writer.writeheader()
+                writer.writerow(sample)
+                log.flush()
+
+            if sample["spatial_sprites"] != sample["orbs"] + sample["fireballs"] \
+                    and not entity_store:
+                problems.append(f"the spatial hash tracks {sample['spatial_sprites']} sprites "
+                                f"at {sample['minutes']:g} min, but only "
+                                f"{sample['orbs'] + sample['fireballs']} are in play")
+    finally:
+        if log is not None:
+            log.close()
+        game.scores.close()
+
+    if stale_sprites:
+        problems.append(f"up to {stale_sprites} orbs or fireballs stayed in play "
+                        f"for more than {max_sprite_age:g} seconds")
+    problems.extend(find_drift(samples, warmup_runs = warmup_runs))
+    return samples, problems
+
+
+def main() -> None:
+    """Function which parses the command line, runs the soak test and reports the problems."""
+    parser = argparse.ArgumentParser(description = "Play many runs in a row to find leaks.")
+    parser.add_argument("--minutes", type = float, default = 60,
+                        help = "game time to play, headless runs play faster than real time")
+    parser.add_argument("--sample-seconds", type = float, default = 60,
+                        help = "game time between two samples")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--entity-store", action = "store_true")
+    parser.add_argument("--max-sprite-age", type = float, default = 30,
+                        help = "seconds an orb or fireball may stay in play")
+    parser.add_argument("--warmup-runs", type = int, default = 2,
+                        help = "finished runs whose samples are not checked for drift")
+    parser.add_argument("--log", default = "soak.csv")
+    args = parser.parse_args()
+
+    samples, problems = soak(args.minutes, args.sample_seconds, args.seed, args.entity_store,
+                             args.max_sprite_age, log_path = args.log,
+                             warmup_runs = args.warmup_runs)
+    print(f"{len(samples)} samples written to {args.log}")
+    for message in problems:
+        print(f"Failed: {message}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
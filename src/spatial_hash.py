@@ -0,0 +1,96 @@
+"""Module for the spatial hash used to find nearby sprites quickly"""
+import pygame
+
+class SpatialHash():
+    """
+    Class which splits the screen into a uniform grid of square cells
+    and remembers which sprites overlap which cells.
+    Cells stay in the grid once they are created, even when they become empty,
+    so sprites moving between them do not create and drop sets every tick.
+    """
+    def __init__(self, cell_size: int = 128) -> None:
+        self.cell_size = cell_size
+
+        self.cells: dict[tuple[int, int], set[pygame.sprite.Sprite]] = {}
+        self.sprite_bounds: dict[pygame.sprite.Sprite, tuple[int, int, int, int]] = {}
+        self.found: set[pygame.sprite.Sprite] = set()
+
+    def bounds(self, rect: pygame.Rect) -> tuple[int, int, int, int]:
+        """Function which returns the first and last cell column and row covered by a rect."""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, sprite: pygame.sprite.Sprite) -> None:
+        """Function which adds a sprite to every cell its rect overlaps."""
+        bounds = self.bounds(sprite.rect)
+        self.sprite_bounds[sprite] = bounds
+        for column in range(bounds[0], bounds[2] + 1):
+            for row in range(bounds[1], bounds[3] + 1):
+                cell = self.cells.get((column, row))
+                if cell is None:
+                    cell = self.cells[(column, row)] = set()
+                cell.add(sprite)
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        """Function which removes a sprite from all of its cells."""
+        bounds = self.sprite_bounds.pop(sprite, None)
+        if bounds is None:
+            return
+        for column in range(bounds[0], bounds[2] + 1):
+            for row in range(bounds[1], bounds[3] + 1):
+                self.cells[(column, row)].discard(sprite)
+
+    def move(self, sprite: pygame.sprite.Sprite) -> None:
+        """Function which moves a sprite to new cells, but only if it crossed a cell border."""
+        if self.sprite_bounds.get(sprite) != self.bounds(sprite.rect):
+            self.remove(sprite)
+            self.insert(sprite)
+
+    def query(self, rect: pygame.Rect) -> set[pygame.sprite.Sprite]:
+        """
+        Function which returns the sprites in all cells overlapped by the given rect.
+        The same set is reused by the next query, so it has to be used up before that.
+        """
+        bounds = self.bounds(rect)
+        found = self.found
+        found.clear()
+        for column in range(bounds[0], bounds[2] + 1):
+            for row in range(bounds[1], bounds[3] + 1):
+                cell = self.cells.get((column, row))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def clear(self) -> None:
+        """Function which removes every sprite from the grid."""
+        self.cells.clear()
+        self.sprite_bounds.clear()
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    Class for a sprite group which keeps its sprites in a spatial hash,
+    updating the hash whenever sprites are added, removed or moved.
+    """
+    def __init__(self, cell_size: int = 128) -> None:
+        self.spatial = SpatialHash(cell_size)
+        super().__init__()
+
+    def add_internal(self, sprite: pygame.sprite.Sprite, layer: int | None = None) -> None:
+        super().add_internal(sprite, layer)
+        self.spatial.insert(sprite)
+
+    def remove_internal(self, sprite: pygame.sprite.Sprite) -> None:
+        super().remove_internal(sprite)
+        self.spatial.remove(sprite)
+
+    def update(self, *args, **kwargs) -> None:
+        """Function which updates every sprite and then moves the ones still alive in the hash."""
+        super().update(*args, **kwargs)
+        for sprite in self.spritedict:
+            self.spatial.move(sprite)
+
+    def nearby(self, rect: pygame.Rect) -> set[pygame.sprite.Sprite]:
+        """Function which returns the sprites of the group that might overlap the given rect."""
+        return self.spatial.query(rect)
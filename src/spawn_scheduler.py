@@ -0,0 +1,95 @@
+"""Module for spawning orbs and fireballs from wave definitions"""
+import heapq
+import json
+
+KINDS = ("orb", "fireball")
+
+
+def load_waves(path: str) -> dict[str, list[dict]]:
+    """Function which reads the wave definitions of every phase from a json file."""
+    with open(path, encoding = "utf-8") as file:
+        return json.load(file)
+
+
+class SpawnScheduler():
+    """
+    Class which turns wave definitions into a schedule counted in simulation ticks.
+    Each wave spawns count entities every interval milliseconds between start and end,
+    and the next due wave is always taken from a priority queue.
+    Every interval is multiplied by interval_scale, so the same waves can be made denser.
+    """
+    def __init__(
+            self, waves: dict[str, list[dict]], tick_rate: int,
+            interval_scale: float = 1.0
+        ) -> None:
+        self.tick_rate = tick_rate
+        self.interval_scale = interval_scale
+        self.phases = {phase: sorted((self.compile(wave) for wave in phase_waves),
+                                     key = lambda wave: wave["start"])
+                       for phase, phase_waves in waves.items()}
+
+        self.phase: str | None = None
+        self.tick = 0
+        self.queue: list[tuple[int, int]] = []
+
+    def to_ticks(self, milliseconds: float) -> int:
+        """Function which converts milliseconds to simulation ticks."""
+        return round(milliseconds * self.tick_rate / 1000)
+
+    def compile(self, wave: dict) -> dict:
+        """Function which checks a wave definition and converts its times to ticks."""
+        if wave["kind"] not in KINDS:
+            raise ValueError(f"Unknown spawn kind {wave['kind']!r}, expected one of {KINDS}")
+
+        interval = self.to_ticks(wave["interval"] * self.interval_scale)
+        if interval <= 0:
+            raise ValueError(f"Wave interval of {wave['interval']} ms is shorter than one tick")
+
+        return {"kind": wave["kind"],
+                "start": self.to_ticks(wave.get("start", 0)),
+                "end": self.to_ticks(wave["end"]) if "end" in wave else None,
+                "interval": interval,
+                "count": wave.get("count", 1),
+                "x": tuple(wave["x"]),
+                "y": tuple(wave["y"]),
+                "speed": wave["speed"]}
+
+    def start(self, phase: str | None) -> None:
+        """Function which restarts the schedule at the beginning of the given phase."""
+        self.phase = phase
+        self.tick = 0
+        self.queue = [(wave["start"], i) for i, wave in enumerate(self.phases.get(phase, []))]
+        heapq.heapify(self.queue)
+
+    def get_state(self) -> tuple[str | None, int, list[tuple[int, int]]]:
+        """Function which returns the phase, the tick and the queue of due waves."""
+        return self.phase, self.tick, list(self.queue)
+
+    def set_state(self, phase: str | None, tick: int, queue: list[tuple[int, int]]) -> None:
+        """Function which puts the schedule back in a state returned by get_state."""
+        self.phase = phase
+        self.tick = tick
+        self.queue = list(queue)
+        heapq.heapify(self.queue)
+
+    def advance(self, phase: str | None) -> list[dict]:
+        """
+        Function which moves the schedule forward by one tick and returns the waves due on it.
+        The schedule starts over whenever the phase changes.
+        """
+        if phase != self.phase:
+            self.start(phase)
+        else:
+            self.tick += 1
+
+        due = []
+        waves = self.phases.get(phase, [])
+        while self.queue and self.queue[0][0] <= self.tick:
+            tick, index = heapq.heappop(self.queue)
+            wave = waves[index]
+            due.append(wave)
+
+            next_tick = tick + wave["interval"]
+            if wave["end"] is None or next_tick <= wave["end"]:
+                heapq.heappush(self.queue, (next_tick, index))
+        return due
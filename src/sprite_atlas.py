@@ -0,0 +1,132 @@
+"""Module for baking all sprite frames into one atlas on disk"""
+import hashlib
+import json
+import mmap
+import os
+import pygame
+from .helper_funcs import get_frame
+
+ATLAS_INDEX = "gfx/atlas.json"
+ATLAS_PIXELS = "gfx/atlas.bin"
+ATLAS_VERSION = 1
+ATLAS_WIDTH = 2048
+PIXEL_FORMAT = "BGRA"
+
+# path, number of frames, size of one frame and scale of every sheet in the atlas
+SHEETS = (("gfx/char_phase_one/Run.png", 6, (42, 42), 4),
+          ("gfx/char_phase_one/Jump.png", 8, (42, 42), 4),
+          ("gfx/char_phase_one/Attack.png", 6, (42, 42), 4),
+          ("gfx/char_phase_two/fly_n.png", 3, (52, 28), 3.5),
+          ("gfx/char_phase_two/fly_up.png", 4, (48, 28), 3.5),
+          ("gfx/char_phase_two/fly_down.png", 4, (51, 28), 3.5),
+          ("gfx/fireball.png", 8, (63, 43), 4))
+
+
+def file_hash(path: str) -> str:
+    """Function which returns the sha256 hash of a file's content."""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def pack(sizes: list[tuple[int, int]], width: int) -> tuple[list[tuple[int, int]], int]:
+    """
+    Function which places rectangles of the given sizes in rows of the given width,
+    tallest first, and returns their positions and the total height.
+    """
+    order = sorted(range(len(sizes)), key = lambda i: sizes[i][1], reverse = True)
+    positions = [(0, 0)] * len(sizes)
+    x, y, row_height = 0, 0, 0
+    for i in order:
+        frame_width, frame_height = sizes[i]
+        if x + frame_width > width:
+            x, y, row_height = 0, y + row_height, 0
+        positions[i] = (x, y)
+        x += frame_width
+        row_height = max(row_height, frame_height)
+    return positions, y + row_height
+
+
+def bake(
+        index_path: str = ATLAS_INDEX, pixels_path: str = ATLAS_PIXELS,
+        sheets: tuple = SHEETS
+    ) -> dict:
+    """
+    Function which slices and scales every sheet, packs all frames into one atlas
+    and writes its raw pixels and an index with the frame rects and source hashes.
+    A display mode has to be set before calling it.
+    """
+    frames = []
+    entries = []
+    for path, frame_count, dimensions, scale in sheets:
+        sheet = pygame.image.load(path).convert_alpha()
+        entries.append({"path": path,
+                        "frame_count": frame_count,
+                        "dimensions": list(dimensions),
+                        "scale": scale,
+                        "hash": file_hash(path),
+                        "rects": []})
+        frames.append([get_frame(sheet, i, dimensions, scale) for i in range(frame_count)])
+
+    sizes = [frame.get_size() for sheet_frames in frames for frame in sheet_frames]
+    positions, height = pack(sizes, ATLAS_WIDTH)
+
+    atlas = pygame.Surface((ATLAS_WIDTH, height), pygame.SRCALPHA)
+    position = iter(positions)
+    for entry, sheet_frames in zip(entries, frames):
+        for frame in sheet_frames:
+            x, y = next(position)
+            atlas.blit(frame, (x, y), special_flags = pygame.BLEND_RGBA_MAX)
+            entry["rects"].append([x, y, *frame.get_size()])
+
+    index = {"version": ATLAS_VERSION,
+             "pixels": os.path.basename(pixels_path),
+             "size": [ATLAS_WIDTH, height],
+             "format": PIXEL_FORMAT,
+             "sheets": entries}
+
+    with open(pixels_path + ".tmp", "wb") as file:
+        file.write(pygame.image.tobytes(atlas, PIXEL_FORMAT))
+    os.replace(pixels_path + ".tmp", pixels_path)
+    with open(index_path, "w", encoding = "utf-8") as file:
+        json.dump(index, file, indent = 2)
+
+    return index
+
+
+def open_atlas(
+        index_path: str = ATLAS_INDEX
+    ) -> tuple[pygame.Surface, mmap.mmap, list[dict]] | None:
+    """
+    Function which maps the baked atlas into a surface without copying its pixels
+    and returns it with the buffer behind it and the sheets whose source files
+    have not changed since baking, or None if there is no usable atlas.
+    """
+    try:
+        with open(index_path, encoding = "utf-8") as file:
+            index = json.load(file)
+        if index.get("version") != ATLAS_VERSION:
+            return None
+
+        pixels_path = os.path.join(os.path.dirname(index_path), index["pixels"])
+        width, height = index["size"]
+        with open(pixels_path, "rb") as file:
+            if os.fstat(file.fileno()).st_size != width * height * 4:
+                return None
+            buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_COPY)
+
+        sheets = [entry for entry in index["sheets"]
+                  if os.path.exists(entry["path"]) and file_hash(entry["path"]) == entry["hash"]]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    surface = pygame.image.frombuffer(buffer, (width, height), index["format"])
+    return surface, buffer, sheets
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    baked = bake()
+    print(f"Baked {sum(len(entry['rects']) for entry in baked['sheets'])} frames "
+          f"into a {baked['size'][0]}x{baked['size'][1]} atlas")
@@ -0,0 +1,51 @@
+"""Module for recycling sprites instead of creating new ones"""
+from typing import Callable
+import pygame
+
+class SpritePool():
+    """
+    Class which keeps a number of unused sprites around
+    so they can be handed out again instead of building new ones.
+    """
+    def __init__(self, factory: Callable[[], pygame.sprite.Sprite], capacity: int) -> None:
+        self.factory = factory
+        self.capacity = capacity
+
+        self.free: list[pygame.sprite.Sprite] = []
+        for _ in range(capacity):
+            self.free.append(self.create())
+
+        self.stats = {"hits": 0,
+                      "misses": 0,
+                      "overflow": 0}
+
+    def create(self) -> pygame.sprite.Sprite:
+        """Function which builds a new sprite which knows the pool it belongs to."""
+        sprite = self.factory()
+        sprite.pool = self
+        return sprite
+
+    def acquire(self) -> pygame.sprite.Sprite:
+        """Function which returns a free sprite, building a new one only if the pool is empty."""
+        if self.free:
+            self.stats["hits"] += 1
+            return self.free.pop()
+
+        self.stats["misses"] += 1
+        return self.create()
+
+    def release(self, sprite: pygame.sprite.Sprite) -> None:
+        """
+        Function which removes a sprite from all of its groups and keeps it for later,
+        unless the pool is already full.
+        """
+        sprite.kill()
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
+        else:
+            self.stats["overflow"] += 1
+
+    def release_all(self, group: pygame.sprite.Group) -> None:
+        """Function which returns every sprite in a group to the pool."""
+        for sprite in group.sprites():
+            self.release(sprite)
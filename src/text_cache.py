@@ -0,0 +1,46 @@
+"""Module for caching rendered text"""
+from collections import OrderedDict
+import pygame
+
+class TextCache():
+    """
+    Class which creates each font size once and remembers rendered text surfaces,
+    dropping the least recently used ones once the cache is full.
+    """
+    def __init__(self, capacity: int = 64) -> None:
+        self.capacity = capacity
+
+        self.fonts: dict[int, pygame.font.Font] = {}
+        self.surfaces: OrderedDict[tuple[str, int, str], pygame.Surface] = OrderedDict()
+
+        self.stats = {"hits": 0,
+                      "misses": 0,
+                      "evictions": 0}
+
+    def get_font(self, size: int) -> pygame.font.Font:
+        """Function which returns the default font in the given size, creating it only once."""
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(None, size)
+        return self.fonts[size]
+
+    def render(self, text: str, size: int, color: str) -> pygame.Surface:
+        """Function which returns the rendered text, rendering it only if it is not cached."""
+        key = (text, size, color)
+        if key in self.surfaces:
+            self.stats["hits"] += 1
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+
+        self.stats["misses"] += 1
+        surface = self.get_font(size).render(text, False, color)
+        self.surfaces[key] = surface
+
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last = False)
+            self.stats["evictions"] += 1
+
+        return surface
+
+    def clear(self) -> None:
+        """Function which drops all rendered surfaces."""
+        self.surfaces.clear()
@@ -0,0 +1,131 @@
+"""Module for mapping the game world to the render surface and the window"""
+import pygame
+
+WORLD_WIDTH = 1280
+WORLD_HEIGHT = 720
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    """Function which reads a size written as WIDTHxHEIGHT, for example 640x360."""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError as error:
+        raise ValueError(f"Expected a size like 640x360, got {text!r}") from error
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Expected a positive size, got {text!r}")
+    return width, height
+
+
+class Viewport():
+    """
+    Class which maps the world coordinates the game is simulated in
+    to an internal render surface of any resolution and scales that surface to the window.
+    Images are scaled to the render resolution once and kept, so a smaller render surface
+    also means fewer pixels to draw every frame.
+    With integer scaling the render surface is only enlarged by whole multiples,
+    which keeps pixel art sharp and leaves black borders around it.
+    """
+    def __init__(
+            self, render_size: tuple[int, int] = (WORLD_WIDTH, WORLD_HEIGHT),
+            window_size: tuple[int, int] = (WORLD_WIDTH, WORLD_HEIGHT),
+            integer_scaling: bool = False
+        ) -> None:
+        self.render_size = render_size
+        self.window_size = window_size
+        self.integer_scaling = integer_scaling
+        self.scale = min(render_size[0] / WORLD_WIDTH, render_size[1] / WORLD_HEIGHT)
+
+        output_scale = min(window_size[0] / render_size[0], window_size[1] / render_size[1])
+        if integer_scaling and output_scale >= 1:
+            output_scale = int(output_scale)
+        output_size = (int(render_size[0] * output_scale), int(render_size[1] * output_scale))
+        self.output_rect = pygame.Rect((0, 0), output_size)
+        self.output_rect.center = (window_size[0] // 2, window_size[1] // 2)
+
+        self.images: dict[pygame.Surface, pygame.Surface] = {}
+
+    def direct(self) -> bool:
+        """Function which returns whether the game can be drawn straight into the window."""
+        return self.render_size == self.window_size
+
+    def create_screen(self, window: pygame.Surface) -> pygame.Surface:
+        """Function which returns the surface the game is drawn on."""
+        if self.direct():
+            return window
+        window.fill("Black")
+        return pygame.Surface(self.render_size).convert()
+
+    def image(self, surface: pygame.Surface) -> pygame.Surface:
+        """
+        Function which returns the image scaled to the render resolution,
+        scaling it only the first time it is asked for.
+        """
+        if self.scale == 1:
+            return surface
+        scaled = self.images.get(surface)
+        if scaled is None:
+            width, height = surface.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            if surface.get_colorkey() is not None:
+                # scaled copies of color-keyed images do not keep the key working,
+                # so the keyed pixels are turned into transparent ones first
+                unkeyed = pygame.Surface((width, height), pygame.SRCALPHA)
+                unkeyed.blit(surface, (0, 0))
+                scaled = pygame.transform.scale(unkeyed, size)
+            else:
+                scaled = pygame.transform.scale(surface, size)
+            self.images[surface] = scaled
+        return scaled
+
+    def point(self, position: tuple[float, float]) -> tuple[float, float]:
+        """Function which converts a position from world to render coordinates."""
+        return (position[0] * self.scale, position[1] * self.scale)
+
+    def rect(self, rect: pygame.Rect) -> pygame.Rect:
+        """Function which converts a rect from world to render coordinates."""
+        if self.scale == 1:
+            return rect
+        return pygame.Rect(round(rect.x * self.scale), round(rect.y * self.scale),
+                           round(rect.width * self.scale), round(rect.height * self.scale))
+
+    def size(self, length: int) -> int:
+        """Function which converts a font size or line width from world to render pixels."""
+        return max(1, round(length * self.scale))
+
+    def to_world(self, position: tuple[int, int]) -> tuple[int, int]:
+        """Function which converts a window position, like the mouse, to world coordinates."""
+        output = self.output_rect
+        render_x = (position[0] - output.x) * self.render_size[0] / output.width
+        render_y = (position[1] - output.y) * self.render_size[1] / output.height
+        return (int(render_x / self.scale), int(render_y / self.scale))
+
+    def to_window(self, rect: pygame.Rect) -> pygame.Rect:
+        """Function which converts a rect on the render surface to the window."""
+        if self.direct():
+            return rect
+        scale_x = self.output_rect.width / self.render_size[0]
+        scale_y = self.output_rect.height / self.render_size[1]
+        window_rect = pygame.Rect(int(self.output_rect.x + rect.x * scale_x),
+                                  int(self.output_rect.y + rect.y * scale_y),
+                                  int(rect.width * scale_x) + 2, int(rect.height * scale_y) + 2)
+        return window_rect.clip(self.output_rect)
+
+    def present(self, screen: pygame.Surface, window: pygame.Surface) -> None:
+        """Function which scales the render surface into the window."""
+        if screen is not window:
+            pygame.transform.scale(screen, self.output_rect.size,
+                                   window.subsurface(self.output_rect))
+
+    def release(self, surfaces: list[pygame.Surface]) -> None:
+        """Function which drops the scaled copies of the given images."""
+        for surface in surfaces:
+            self.images.pop(surface, None)
+
+    def image_bytes(self) -> int:
+        """Function which returns the memory used by the scaled images in bytes."""
+        return sum(image.get_width() * image.get_height() * image.get_bytesize()
+                   for image in self.images.values())
+
+    def clear(self) -> None:
+        """Function which drops the scaled images."""
+        self.images.clear()